@@ -46,7 +46,7 @@ class BaseAgent(ABC):
     
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Main execution method with error handling and metrics"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         self.metrics["total_requests"] += 1
         self.last_activity = datetime.now()
         
@@ -68,7 +68,7 @@ class BaseAgent(ABC):
             final_result = await self._postprocess_output(result)
             
             # Update metrics
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             self._update_success_metrics(execution_time)
             
             # Update context
@@ -86,7 +86,7 @@ class BaseAgent(ABC):
             }
             
         except Exception as e:
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             self._update_failure_metrics(execution_time)
             
             self.logger.error(f"❌ Processing failed: {str(e)}")
@@ -137,18 +137,21 @@ class BaseAgent(ABC):
     def _update_success_metrics(self, execution_time: float):
         """Update metrics for successful execution"""
         self.metrics["successful_requests"] += 1
-        self.metrics["total_response_time"] += execution_time
-        self.metrics["avg_response_time"] = (
-            self.metrics["total_response_time"] / self.metrics["total_requests"]
-        )
+        self._update_response_time(execution_time)
     
     def _update_failure_metrics(self, execution_time: float):
         """Update metrics for failed execution"""
         self.metrics["failed_requests"] += 1
+        self._update_response_time(execution_time)
+    
+    def _update_response_time(self, execution_time: float):
+        """Fold a completed request into the running average response time"""
+        # Averaged over completed requests; total_requests also counts in-flight ones
+        completed = self.metrics["successful_requests"] + self.metrics["failed_requests"]
         self.metrics["total_response_time"] += execution_time
-        self.metrics["avg_response_time"] = (
-            self.metrics["total_response_time"] / self.metrics["total_requests"]
-        )
+        self.metrics["avg_response_time"] += (
+            execution_time - self.metrics["avg_response_time"]
+        ) / completed
     
     def get_status(self) -> Dict[str, Any]:
         """Get agent status and metrics"""
@@ -2,10 +2,15 @@
 Conversation Agent for managing multi-turn conversations and context
 """
 import json
+import random
+import re
+import uuid
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
 from .base_agent import BaseAgent
 
+_NUMBER_RE = re.compile(r'\d+')
+
 class ConversationAgent(BaseAgent):
     """Agent specialized in conversation management and context tracking"""
     
@@ -305,7 +310,6 @@ class ConversationAgent(BaseAgent):
     
     def _generate_session_id(self) -> str:
         """Generate unique session ID"""
-        import uuid
         return f"session_{uuid.uuid4().hex[:8]}"
     
     async def _detect_intent(self, message: str) -> str:
@@ -478,7 +482,6 @@ Just ask me anything about police data and I'll help you find the information yo
     
     def _get_template_response(self, template_type: str) -> str:
         """Get random response from template"""
-        import random
         templates = self.conversation_templates.get(template_type, ["I understand."])
         return random.choice(templates)
     
@@ -507,8 +510,6 @@ Just ask me anything about police data and I'll help you find the information yo
     async def _extract_keywords(self, message: str) -> List[str]:
         """Extract keywords from message"""
         # Simple keyword extraction
-        import re
-        
         # CCTNS-specific keywords
         cctns_keywords = ["fir", "arrest", "officer", "station", "district", "crime", "police"]
         
@@ -538,13 +539,13 @@ Just ask me anything about police data and I'll help you find the information yo
         
         # Extract districts
         districts = ["Guntur", "Vijayawada", "Visakhapatnam", "Krishna", "Kurnool"]
+        message_lower = message.lower()
         for district in districts:
-            if district.lower() in message.lower():
+            if district.lower() in message_lower:
                 entities["districts"].append(district)
         
         # Extract numbers
-        import re
-        numbers = re.findall(r'\d+', message)
+        numbers = _NUMBER_RE.findall(message)
         entities["numbers"] = numbers
         
         return entities
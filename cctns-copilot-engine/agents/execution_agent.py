@@ -2,7 +2,10 @@
 Execution Agent for running SQL queries against the database
 """
 import asyncio
+import hashlib
+import re
 import time
+from datetime import date, datetime
 from typing import Dict, Any, List, Optional
 from .base_agent import BaseAgent
 
@@ -13,13 +16,26 @@ try:
 except ImportError:
     class SQLExecutor:
         def __init__(self, connection_string): pass
-        async def execute_query(self, sql):
+        async def execute_query(self, sql, params=None):
             return {"success": True, "data": [{"id": 1, "name": "Sample"}], "row_count": 1}
     
     class DatabaseManager:
         def __init__(self): pass
         def validate_query(self, sql): return {"valid": True}
 
+# SQL injection signatures, scanned in a single pass. Each alternative sits
+# in a lookahead so overlapping signatures are all reported.
+_INJECTION_PATTERNS = [
+    r"'\s*OR\s+'", r"'\s*;\s*", r"--", r"/\*", r"\*/",
+    r"UNION\s+SELECT", r"DROP\s+TABLE", r"DELETE\s+FROM"
+]
+_INJECTION_RE = re.compile(
+    '(?=(?:' + '|'.join(f'(?P<p{i}>{pattern})' for i, pattern in enumerate(_INJECTION_PATTERNS)) + '))'
+)
+
+# Tables referenced after FROM/JOIN, checked against the allow-list
+_TABLE_REF_RE = re.compile(r'(?:FROM|JOIN)\s+(\w+)')
+
 class ExecutionAgent(BaseAgent):
     """Agent specialized in executing SQL queries safely"""
     
@@ -46,6 +62,8 @@ class ExecutionAgent(BaseAgent):
         self.blocked_operations = config.get("blocked_operations", [
             "DROP", "DELETE", "UPDATE", "INSERT", "TRUNCATE", "ALTER", "CREATE"
         ])
+        self._blocked_re = re.compile(r'\b(' + '|'.join(map(re.escape, self.blocked_operations)) + r')\b')
+        self._allowed_tables_upper = frozenset(table.upper() for table in self.allowed_tables)
     
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Execute SQL query with safety checks and monitoring"""
@@ -77,9 +95,9 @@ class ExecutionAgent(BaseAgent):
         sql_upper = sql.upper()
         
         # Check for blocked operations
-        for operation in self.blocked_operations:
-            if operation in sql_upper:
-                return {"valid": False, "reason": f"Blocked operation: {operation}"}
+        blocked = self._blocked_re.search(sql_upper) if self.blocked_operations else None
+        if blocked:
+            return {"valid": False, "reason": f"Blocked operation: {blocked.group(1)}"}
         
         # Check for required SELECT
         if not sql_upper.startswith("SELECT"):
@@ -91,17 +109,18 @@ class ExecutionAgent(BaseAgent):
         """Execute SQL query with full safety checks"""
         
         sql = input_data.get("sql", "").strip()
+        binds = input_data.get("binds") or {}
         use_cache = input_data.get("use_cache", self.enable_query_cache)
         format_results = input_data.get("format_results", True)
         
         self.logger.info(f"⚡ Executing SQL: {sql[:100]}...")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             # Step 1: Check cache
             if use_cache and self.query_cache is not None:
-                cache_key = self._generate_cache_key(sql)
+                cache_key = self._generate_cache_key(sql, binds)
                 cached_result = self._get_from_cache(cache_key)
                 if cached_result:
                     self.cache_stats["hits"] += 1
@@ -109,7 +128,7 @@ class ExecutionAgent(BaseAgent):
                     return {
                         **cached_result,
                         "from_cache": True,
-                        "execution_time": time.time() - start_time
+                        "execution_time": time.perf_counter() - start_time
                     }
                 else:
                     self.cache_stats["misses"] += 1
@@ -121,7 +140,7 @@ class ExecutionAgent(BaseAgent):
             
             # Step 3: Execute with timeout
             execution_result = await asyncio.wait_for(
-                self.sql_executor.execute_query(sql),
+                self.sql_executor.execute_query(sql, binds),
                 timeout=self.query_timeout
             )
             
@@ -138,7 +157,7 @@ class ExecutionAgent(BaseAgent):
                 raw_data = raw_data[:self.max_result_rows]
             
             # Step 5: Format results
-            formatted_data = await self._format_query_results(raw_data) if format_results else raw_data
+            formatted_data = self._format_query_results(raw_data) if format_results else raw_data
             
             # Step 6: Generate metadata
             execution_metadata = {
@@ -149,17 +168,18 @@ class ExecutionAgent(BaseAgent):
                 "truncated": row_count > self.max_result_rows
             }
             
+            execution_time = time.perf_counter() - start_time
             result = {
                 "success": True,
                 "data": formatted_data,
                 "metadata": execution_metadata,
                 "sql": sql,
                 "from_cache": False,
-                "execution_time": time.time() - start_time,
+                "execution_time": execution_time,
                 "context_updates": {
                     "last_executed_sql": sql,
                     "last_result_count": len(formatted_data),
-                    "last_execution_time": time.time() - start_time
+                    "last_execution_time": execution_time
                 }
             }
             
@@ -167,7 +187,7 @@ class ExecutionAgent(BaseAgent):
             if use_cache and self.query_cache is not None:
                 self._store_in_cache(cache_key, result)
             
-            self.logger.info(f"✅ Query executed successfully: {len(formatted_data)} rows in {time.time() - start_time:.2f}s")
+            self.logger.info(f"✅ Query executed successfully: {len(formatted_data)} rows in {execution_time:.2f}s")
             
             return result
             
@@ -177,7 +197,7 @@ class ExecutionAgent(BaseAgent):
                 "success": False,
                 "error": f"Query timeout after {self.query_timeout} seconds",
                 "sql": sql,
-                "execution_time": time.time() - start_time
+                "execution_time": time.perf_counter() - start_time
             }
             
         except Exception as e:
@@ -186,7 +206,7 @@ class ExecutionAgent(BaseAgent):
                 "success": False,
                 "error": str(e),
                 "sql": sql,
-                "execution_time": time.time() - start_time
+                "execution_time": time.perf_counter() - start_time
             }
     
     async def _validate_sql_only(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -201,7 +221,7 @@ class ExecutionAgent(BaseAgent):
                 "valid": validation_result["valid"],
                 "validation_details": validation_result,
                 "sql": sql,
-                "security_check": await self._perform_security_check(sql)
+                "security_check": self._perform_security_check(sql)
             }
             
         except Exception as e:
@@ -215,13 +235,14 @@ class ExecutionAgent(BaseAgent):
         """Explain query execution plan"""
         
         sql = input_data.get("sql", "")
+        binds = input_data.get("binds") or {}
         
         try:
             # Add EXPLAIN PLAN to the query
             explain_sql = f"EXPLAIN PLAN FOR {sql}"
             
             # Execute explain
-            explain_result = await self.sql_executor.execute_query(explain_sql)
+            explain_result = await self.sql_executor.execute_query(explain_sql, binds)
             
             # Get plan details
             plan_sql = "SELECT * FROM TABLE(DBMS_XPLAN.DISPLAY)"
@@ -285,7 +306,7 @@ class ExecutionAgent(BaseAgent):
             "completed_queries": len(results)
         }
     
-    async def _format_query_results(self, raw_data: List[Dict]) -> List[Dict]:
+    def _format_query_results(self, raw_data: List[Dict]) -> List[Dict]:
         """Format query results for better presentation"""
         if not raw_data:
             return []
@@ -316,7 +337,7 @@ class ExecutionAgent(BaseAgent):
         
         return formatted_data
     
-    async def _perform_security_check(self, sql: str) -> Dict[str, Any]:
+    def _perform_security_check(self, sql: str) -> Dict[str, Any]:
         """Perform comprehensive security check"""
         
         security_issues = []
@@ -325,22 +346,15 @@ class ExecutionAgent(BaseAgent):
         sql_upper = sql.upper()
         
         # Check for SQL injection patterns
-        injection_patterns = [
-            r"'\s*OR\s+'", r"'\s*;\s*", r"--", r"/\*", r"\*/",
-            r"UNION\s+SELECT", r"DROP\s+TABLE", r"DELETE\s+FROM"
-        ]
-        
-        for pattern in injection_patterns:
-            if re.search(pattern, sql_upper):
+        matched = {match.lastgroup for match in _INJECTION_RE.finditer(sql_upper)}
+        for index, pattern in enumerate(_INJECTION_PATTERNS):
+            if f'p{index}' in matched:
                 security_issues.append(f"Potential SQL injection pattern: {pattern}")
                 severity_level = "HIGH"
         
         # Check for unauthorized table access
-        mentioned_tables = re.findall(r'FROM\s+(\w+)|JOIN\s+(\w+)', sql_upper)
-        flat_tables = [table for group in mentioned_tables for table in group if table]
-        
-        for table in flat_tables:
-            if table not in [t.upper() for t in self.allowed_tables]:
+        for table in _TABLE_REF_RE.findall(sql_upper):
+            if table not in self._allowed_tables_upper:
                 security_issues.append(f"Unauthorized table access: {table}")
                 severity_level = "MEDIUM"
         
@@ -351,10 +365,10 @@ class ExecutionAgent(BaseAgent):
             "scan_timestamp": datetime.now().isoformat()
         }
     
-    def _generate_cache_key(self, sql: str) -> str:
-        """Generate cache key for SQL query"""
-        import hashlib
-        return hashlib.md5(sql.encode()).hexdigest()
+    def _generate_cache_key(self, sql: str, binds: Optional[Dict[str, Any]] = None) -> str:
+        """Generate cache key for SQL query and its bind values"""
+        key = sql if not binds else f"{sql}\0{sorted(binds.items())!r}"
+        return hashlib.md5(key.encode()).hexdigest()
     
     def _get_from_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """Get result from cache"""
@@ -362,7 +376,7 @@ class ExecutionAgent(BaseAgent):
             cached_data, timestamp = self.query_cache[cache_key]
             
             # Check if cache is still valid
-            if time.time() - timestamp < (self.cache_ttl * 60):
+            if time.monotonic() - timestamp < (self.cache_ttl * 60):
                 return cached_data
             else:
                 # Remove expired cache
@@ -374,7 +388,7 @@ class ExecutionAgent(BaseAgent):
         """Store result in cache"""
         # Don't cache errors or very large results
         if result.get("success") and len(result.get("data", [])) < 100:
-            self.query_cache[cache_key] = (result, time.time())
+            self.query_cache[cache_key] = (result, time.monotonic())
             
             # Limit cache size
             if len(self.query_cache) > 100:
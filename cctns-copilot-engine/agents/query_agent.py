@@ -2,15 +2,19 @@
 Query Agent for natural language to SQL conversion
 """
 import re
-import sqlparse
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 from .base_agent import BaseAgent
 
 # Import processors (fallback for missing modules)
 try:
-    from models.nl2sql_processor import NL2SQLProcessor
+    # _SQL_SHAPE: the processor's leading-keyword check, reused so validation
+    # doesn't need a full sqlparse parse
+    from models.nl2sql_processor import NL2SQLProcessor, _SQL_SHAPE
     from models.schema_manager import SchemaManager
 except ImportError:
+    _SQL_SHAPE = None
+    
     class NL2SQLProcessor:
         def __init__(self, config): pass
         async def generate_sql(self, text):
@@ -21,6 +25,51 @@ except ImportError:
         def get_table_info(self, table): return {"columns": ["id", "name"]}
         def get_all_tables(self): return ["FIR", "ARREST", "OFFICER_MASTER"]
 
+@lru_cache(maxsize=1024)
+def _parse_statement_type(sql: str) -> Optional[str]:
+    """Statement type from a full sqlparse parse (memoized; parsing is pure)"""
+    # Imported lazily: sqlparse is only needed when strict parsing is enabled
+    import sqlparse
+    
+    parsed = sqlparse.parse(sql)
+    return parsed[0].get_type() if parsed else None
+
+# Table extraction runs on every query; use RE2's linear-time matcher when installed
+try:
+    import re2 as _table_re_engine
+except ImportError:
+    _table_re_engine = re
+
+# Precompiled scanners shared by all QueryAgent instances
+_TABLE_RE = _table_re_engine.compile(r'(?i)(?:FROM|JOIN|UPDATE|INSERT\s+INTO)\s+(\w+)')
+_COLUMNS_RE = re.compile(r'SELECT\s+(.*?)\s+FROM', re.IGNORECASE | re.DOTALL)
+_SQL_FEATURE_RE = re.compile(r'JOIN|GROUP BY|ORDER BY|COUNT|SUM|AVG|MIN|MAX')
+_AGGREGATE_FUNCTIONS = frozenset(["COUNT", "SUM", "AVG", "MIN", "MAX"])
+_ENTITY_MENTION_RE = re.compile(r'\b(FIR|ARREST|OFFICER|DISTRICT)\b')
+
+_ABBREVIATIONS = {
+    "fir": "first information report",
+    "sho": "station house officer",
+    "asi": "assistant sub inspector",
+    "si": "sub inspector"
+}
+_ABBREVIATION_RE = re.compile(r'\b(' + '|'.join(_ABBREVIATIONS) + r')\b')
+
+_DISTRICT_CORRECTIONS = {
+    "guntur": "Guntur",
+    "vijayawada": "Vijayawada",
+    "visakhapatnam": "Visakhapatnam"
+}
+_DISTRICT_CORRECTION_RE = re.compile(r'\b(' + '|'.join(_DISTRICT_CORRECTIONS) + r')\b', re.IGNORECASE)
+
+_ANALYTICAL_PATTERNS = {
+    "trend_analysis": re.compile(r'\b(trend|over time|monthly|yearly)\b'),
+    "comparison": re.compile(r'\b(compare|vs|versus|between)\b'),
+    "distribution": re.compile(r'\b(distribution|breakdown|by district|by type)\b'),
+    "ranking": re.compile(r'\b(top|highest|lowest|rank)\b'),
+    "percentage": re.compile(r'\b(percent|percentage|ratio)\b')
+}
+
 class QueryAgent(BaseAgent):
     """Agent specialized in NL to SQL query generation"""
     
@@ -36,8 +85,16 @@ class QueryAgent(BaseAgent):
         self.blocked_keywords = config.get("blocked_keywords", [
             "DROP", "DELETE", "UPDATE", "INSERT", "TRUNCATE", "ALTER", "CREATE"
         ])
+        self._blocked_re = re.compile(r'\b(' + '|'.join(map(re.escape, self.blocked_keywords)) + r')\b')
         self.max_result_limit = config.get("max_result_limit", 1000)
         
+        # Full sqlparse validation is slower; only used when explicitly enabled,
+        # e.g. via the STRICT_SQL_PARSE setting
+        self.deep_validate = config.get("deep_validate", False)
+        
+        # Schema is effectively static - built lazily, reset with clear_cache()
+        self._known_tables: Optional[frozenset] = None
+        
         # Query templates for common patterns
         self.query_templates = {
             "count": "SELECT COUNT(*) FROM {table} WHERE {conditions}",
@@ -86,7 +143,7 @@ class QueryAgent(BaseAgent):
         
         try:
             # Step 1: Preprocess query text
-            processed_text = await self._preprocess_query_text(query_text)
+            processed_text = self._preprocess_query_text(query_text)
             
             # Step 2: Generate SQL using NL2SQL processor
             sql_result = await self.nl2sql_processor.generate_sql(processed_text)
@@ -96,31 +153,34 @@ class QueryAgent(BaseAgent):
                     "sql": "",
                     "confidence": 0.0,
                     "error": sql_result.get("error", "SQL generation failed"),
-                    "suggestions": await self._get_query_suggestions(query_text),
+                    "suggestions": self._get_query_suggestions(query_text),
                     "original_query": query_text
                 }
             
             generated_sql = sql_result.get("sql", "")
             
-            # Step 3: Validate and sanitize SQL
-            validation_result = await self._validate_sql(generated_sql)
+            # Step 3: Validate SQL (upper-cased and scanned for tables once).
+            # Steps 3-5 stay sequential: they are CPU-only, so gathering them
+            # overlaps nothing, and limits/metadata are wasted on rejected SQL
+            sql_upper = generated_sql.upper()
+            validation_result = self._validate_sql(generated_sql, sql_upper)
             if not validation_result["valid"]:
                 return {
                     "sql": "",
                     "confidence": 0.0,
                     "error": f"Generated SQL validation failed: {validation_result['reason']}",
-                    "suggestions": await self._get_query_suggestions(query_text),
+                    "suggestions": self._get_query_suggestions(query_text),
                     "original_query": query_text
                 }
             
-            # Step 4: Add safety limits
-            safe_sql = await self._add_safety_limits(generated_sql)
-            
-            # Step 5: Extract query metadata
-            metadata = await self._extract_query_metadata(safe_sql)
+            # Step 4-5: Add safety limits and extract metadata
+            safe_sql, metadata = self._limit_and_describe(
+                generated_sql, sql_upper, validation_result.get("tables")
+            )
             
             return {
                 "sql": safe_sql,
+                "binds": sql_result.get("binds", {}),
                 "confidence": sql_result.get("confidence", 0.0),
                 "metadata": metadata,
                 "original_query": query_text,
@@ -128,6 +188,7 @@ class QueryAgent(BaseAgent):
                 "estimated_rows": metadata.get("estimated_rows", 0),
                 "context_updates": {
                     "last_generated_sql": safe_sql,
+                    "last_generated_binds": sql_result.get("binds", {}),
                     "last_query_type": "standard",
                     "tables_accessed": metadata.get("tables", [])
                 }
@@ -139,7 +200,7 @@ class QueryAgent(BaseAgent):
                 "sql": "",
                 "confidence": 0.0,
                 "error": str(e),
-                "suggestions": await self._get_query_suggestions(query_text),
+                "suggestions": self._get_query_suggestions(query_text),
                 "original_query": query_text
             }
     
@@ -150,7 +211,7 @@ class QueryAgent(BaseAgent):
         
         try:
             # Analyze query for complexity patterns
-            complexity_analysis = await self._analyze_query_complexity(query_text)
+            complexity_analysis = self._analyze_query_complexity(query_text)
             
             if complexity_analysis["complexity_score"] > self.max_query_complexity:
                 return {
@@ -168,7 +229,7 @@ class QueryAgent(BaseAgent):
                 return standard_result
             
             # Enhance with complex features
-            enhanced_sql = await self._enhance_sql_for_complexity(
+            enhanced_sql = self._enhance_sql_for_complexity(
                 standard_result["sql"], 
                 complexity_analysis
             )
@@ -199,7 +260,7 @@ class QueryAgent(BaseAgent):
         
         try:
             # Identify analytical patterns
-            analytical_patterns = await self._identify_analytical_patterns(query_text)
+            analytical_patterns = self._identify_analytical_patterns(query_text)
             
             # Generate base query
             base_result = await self._generate_standard_query(query_text, context)
@@ -208,7 +269,7 @@ class QueryAgent(BaseAgent):
                 return base_result
             
             # Transform to analytical query
-            analytical_sql = await self._transform_to_analytical_sql(
+            analytical_sql = self._transform_to_analytical_sql(
                 base_result["sql"], 
                 analytical_patterns
             )
@@ -236,7 +297,7 @@ class QueryAgent(BaseAgent):
         """Generate SQL using predefined templates"""
         
         # Identify template pattern
-        template_match = await self._match_query_template(query_text)
+        template_match = self._match_query_template(query_text)
         
         if not template_match:
             return await self._generate_standard_query(query_text, context)
@@ -259,70 +320,83 @@ class QueryAgent(BaseAgent):
             }
         }
     
-    async def _preprocess_query_text(self, query_text: str) -> str:
+    def _preprocess_query_text(self, query_text: str) -> str:
         """Preprocess and normalize query text"""
         # Convert to lowercase
         processed = query_text.lower().strip()
         
         # Expand common abbreviations
-        abbreviations = {
-            "fir": "first information report",
-            "sho": "station house officer", 
-            "asi": "assistant sub inspector",
-            "si": "sub inspector"
-        }
-        
-        for abbr, full in abbreviations.items():
-            processed = re.sub(rf'\b{abbr}\b', full, processed)
+        processed = _ABBREVIATION_RE.sub(lambda m: _ABBREVIATIONS[m.group(1)], processed)
         
         # Normalize district names
-        district_corrections = {
-            "guntur": "Guntur",
-            "vijayawada": "Vijayawada", 
-            "visakhapatnam": "Visakhapatnam"
-        }
-        
-        for wrong, correct in district_corrections.items():
-            processed = re.sub(rf'\b{wrong}\b', correct, processed, flags=re.IGNORECASE)
+        processed = _DISTRICT_CORRECTION_RE.sub(lambda m: _DISTRICT_CORRECTIONS[m.group(1).lower()], processed)
         
         return processed
     
-    async def _validate_sql(self, sql: str) -> Dict[str, Any]:
-        """Validate generated SQL for security and correctness"""
+    def _validate_sql(self, sql: str, sql_upper: Optional[str] = None) -> Dict[str, Any]:
+        """Validate generated SQL for security and correctness; returns the tables it found"""
         try:
-            # Parse SQL
-            parsed = sqlparse.parse(sql)
-            if not parsed:
-                return {"valid": False, "reason": "Invalid SQL syntax"}
+            if sql_upper is None:
+                sql_upper = sql.upper()
             
-            statement = parsed[0]
+            # Parse SQL
+            if self.deep_validate:
+                operation = _parse_statement_type(sql)
+                if operation is None:
+                    return {"valid": False, "reason": "Invalid SQL syntax"}
+            else:
+                if not sql.strip() or sql.count("(") != sql.count(")"):
+                    return {"valid": False, "reason": "Invalid SQL syntax"}
+                is_select = _SQL_SHAPE is not None and _SQL_SHAPE.match(sql)
+                operation = "SELECT" if is_select else self._get_query_type(sql, sql_upper)
             
             # Check for blocked keywords
-            sql_upper = sql.upper()
-            for keyword in self.blocked_keywords:
-                if keyword in sql_upper:
-                    return {"valid": False, "reason": f"Blocked keyword found: {keyword}"}
+            blocked = self._blocked_re.search(sql_upper) if self.blocked_keywords else None
+            if blocked:
+                return {"valid": False, "reason": f"Blocked keyword found: {blocked.group(1)}"}
             
             # Check allowed operations
-            if statement.get_type() not in self.allowed_operations:
-                return {"valid": False, "reason": f"Operation not allowed: {statement.get_type()}"}
+            if operation not in self.allowed_operations:
+                return {"valid": False, "reason": f"Operation not allowed: {operation}"}
             
             # Validate table names against schema
             tables = self._extract_table_names(sql)
-            available_tables = self.schema_manager.get_all_tables()
+            available_tables = self._get_known_tables()
             
             for table in tables:
-                if table.upper() not in [t.upper() for t in available_tables]:
+                if table.upper() not in available_tables:
                     return {"valid": False, "reason": f"Unknown table: {table}"}
             
-            return {"valid": True}
+            return {"valid": True, "tables": tables}
             
         except Exception as e:
             return {"valid": False, "reason": f"SQL validation error: {str(e)}"}
     
-    async def _add_safety_limits(self, sql: str) -> str:
+    def _get_known_tables(self) -> frozenset:
+        """Get upper-cased table names from the schema manager (cached)"""
+        if self._known_tables is None:
+            self._known_tables = frozenset(t.upper() for t in self.schema_manager.get_all_tables())
+        return self._known_tables
+    
+    def clear_cache(self):
+        """Drop cached schema lookups, e.g. after the schema is refreshed"""
+        self._known_tables = None
+    
+    def _limit_and_describe(
+        self, sql: str, sql_upper: Optional[str] = None, tables: Optional[List[str]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Add safety limits and extract metadata for the limited SQL"""
+        if sql_upper is None:
+            sql_upper = sql.upper()
+        safe_sql = self._add_safety_limits(sql, sql_upper)
+        
+        # Anything appended by _add_safety_limits is already upper case and names no tables
+        safe_upper = sql_upper + safe_sql[len(sql):]
+        return safe_sql, self._extract_query_metadata(safe_sql, safe_upper, tables)
+    
+    def _add_safety_limits(self, sql: str, sql_upper: Optional[str] = None) -> str:
         """Add safety limits to SQL queries"""
-        sql_upper = sql.upper().strip()
+        sql_upper = (sql_upper if sql_upper is not None else sql.upper()).strip()
         
         # Add LIMIT if not present and it's a SELECT
         if sql_upper.startswith("SELECT") and "LIMIT" not in sql_upper:
@@ -330,42 +404,37 @@ class QueryAgent(BaseAgent):
         
         return sql
     
-    async def _extract_query_metadata(self, sql: str) -> Dict[str, Any]:
+    def _extract_query_metadata(
+        self, sql: str, sql_upper: Optional[str] = None, tables: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
         """Extract metadata from SQL query"""
+        if sql_upper is None:
+            sql_upper = sql.upper()
+        
+        # One scan for all clause/aggregate probes
+        features = set(_SQL_FEATURE_RE.findall(sql_upper))
         metadata = {
-            "tables": self._extract_table_names(sql),
+            "tables": tables if tables is not None else self._extract_table_names(sql),
             "columns": self._extract_column_names(sql),
-            "query_type": self._get_query_type(sql),
-            "has_joins": "JOIN" in sql.upper(),
-            "has_aggregations": any(func in sql.upper() for func in ["COUNT", "SUM", "AVG", "MIN", "MAX"]),
-            "has_groupby": "GROUP BY" in sql.upper(),
-            "has_orderby": "ORDER BY" in sql.upper(),
+            "query_type": self._get_query_type(sql, sql_upper),
+            "has_joins": "JOIN" in features,
+            "has_aggregations": not features.isdisjoint(_AGGREGATE_FUNCTIONS),
+            "has_groupby": "GROUP BY" in features,
+            "has_orderby": "ORDER BY" in features,
             "estimated_rows": self.max_result_limit
         }
         
         return metadata
     
     def _extract_table_names(self, sql: str) -> List[str]:
-        """Extract table names from SQL"""
+        """Extract table names from SQL, in order of first appearance"""
         # Simple regex-based extraction
-        patterns = [
-            r'FROM\s+(\w+)',
-            r'JOIN\s+(\w+)',
-            r'UPDATE\s+(\w+)',
-            r'INSERT\s+INTO\s+(\w+)'
-        ]
-        
-        tables = []
-        for pattern in patterns:
-            matches = re.findall(pattern, sql, re.IGNORECASE)
-            tables.extend(matches)
-        
-        return list(set(tables))
+        return list(dict.fromkeys(_TABLE_RE.findall(sql)))
     
     def _extract_column_names(self, sql: str) -> List[str]:
         """Extract column names from SQL"""
         # Simple extraction - could be improved
-        select_match = re.search(r'SELECT\s+(.*?)\s+FROM', sql, re.IGNORECASE | re.DOTALL)
+        select_match = _COLUMNS_RE.search(sql)
         if select_match:
             columns_str = select_match.group(1)
             if columns_str.strip() == "*":
@@ -376,9 +445,9 @@ class QueryAgent(BaseAgent):
         
         return []
     
-    def _get_query_type(self, sql: str) -> str:
+    def _get_query_type(self, sql: str, sql_upper: Optional[str] = None) -> str:
         """Get the type of SQL query"""
-        sql_upper = sql.upper().strip()
+        sql_upper = (sql_upper if sql_upper is not None else sql.upper()).strip()
         
         if sql_upper.startswith("SELECT"):
             return "SELECT"
@@ -391,41 +460,45 @@ class QueryAgent(BaseAgent):
         else:
             return "UNKNOWN"
     
-    async def _get_query_suggestions(self, query_text: str) -> List[str]:
+    def _get_query_suggestions(self, query_text: str) -> List[str]:
         """Get suggestions for failed queries"""
         suggestions = []
+        query_lower = query_text.lower()
         
         # Common suggestions based on query patterns
-        if "count" in query_text.lower():
+        if "count" in query_lower:
             suggestions.append("Try: 'How many FIRs were registered in Guntur?'")
         
-        if "list" in query_text.lower() or "show" in query_text.lower():
+        if "list" in query_lower or "show" in query_lower:
             suggestions.append("Try: 'Show me recent FIRs from Krishna district'")
         
-        if not any(table in query_text.upper() for table in ["FIR", "ARREST", "OFFICER", "DISTRICT"]):
+        query_upper = query_text.upper()
+        if not any(table in query_upper for table in ["FIR", "ARREST", "OFFICER", "DISTRICT"]):
             suggestions.append("Make sure to mention specific tables like FIR, ARREST, OFFICER_MASTER, etc.")
         
         suggestions.append("Use simpler language and be specific about what data you want")
         
         return suggestions
     
-    async def _analyze_query_complexity(self, query_text: str) -> Dict[str, Any]:
+    def _analyze_query_complexity(self, query_text: str) -> Dict[str, Any]:
         """Analyze query complexity"""
         complexity_score = 0
         factors = []
         
+        query_lower = query_text.lower()
+        
         # Check for multiple tables
-        if len(re.findall(r'\b(FIR|ARREST|OFFICER|DISTRICT)\b', query_text.upper())) > 1:
+        if len(_ENTITY_MENTION_RE.findall(query_text.upper())) > 1:
             complexity_score += 2
             factors.append("multiple_tables")
         
         # Check for aggregations
-        if any(word in query_text.lower() for word in ["count", "sum", "average", "total"]):
+        if any(word in query_lower for word in ["count", "sum", "average", "total"]):
             complexity_score += 1
             factors.append("aggregations")
         
         # Check for time ranges
-        if any(word in query_text.lower() for word in ["between", "from", "to", "during"]):
+        if any(word in query_lower for word in ["between", "from", "to", "during"]):
             complexity_score += 1
             factors.append("date_ranges")
         
@@ -435,30 +508,28 @@ class QueryAgent(BaseAgent):
             "is_complex": complexity_score > 3
         }
     
-    async def _enhance_sql_for_complexity(self, base_sql: str, complexity_analysis: Dict[str, Any]) -> str:
+    def _enhance_sql_for_complexity(self, base_sql: str, complexity_analysis: Dict[str, Any]) -> str:
         """Enhance SQL for complex requirements"""
         enhanced_sql = base_sql
         
         # Add appropriate JOINs if multiple tables detected
         if "multiple_tables" in complexity_analysis["factors"]:
-            enhanced_sql = await self._add_intelligent_joins(enhanced_sql)
+            enhanced_sql = self._add_intelligent_joins(enhanced_sql)
         
         return enhanced_sql
     
-    async def _add_intelligent_joins(self, sql: str) -> str:
+    def _add_intelligent_joins(self, sql: str) -> str:
         """Add intelligent JOINs based on schema relationships"""
         # This would implement smart JOIN logic based on foreign key relationships
         # For now, return the original SQL
         return sql
     
-    async def _identify_analytical_patterns(self, query_text: str) -> Dict[str, Any]:
+    def _identify_analytical_patterns(self, query_text: str) -> Dict[str, Any]:
         """Identify analytical patterns in query"""
+        query_lower = query_text.lower()
         patterns = {
-            "trend_analysis": bool(re.search(r'\b(trend|over time|monthly|yearly)\b', query_text.lower())),
-            "comparison": bool(re.search(r'\b(compare|vs|versus|between)\b', query_text.lower())),
-            "distribution": bool(re.search(r'\b(distribution|breakdown|by district|by type)\b', query_text.lower())),
-            "ranking": bool(re.search(r'\b(top|highest|lowest|rank)\b', query_text.lower())),
-            "percentage": bool(re.search(r'\b(percent|percentage|ratio)\b', query_text.lower()))
+            name: bool(pattern.search(query_lower))
+            for name, pattern in _ANALYTICAL_PATTERNS.items()
         }
         
         return {
@@ -466,7 +537,7 @@ class QueryAgent(BaseAgent):
             "primary_pattern": max(patterns.keys(), key=lambda k: patterns[k]) if any(patterns.values()) else None
         }
     
-    async def _transform_to_analytical_sql(self, base_sql: str, patterns: Dict[str, Any]) -> str:
+    def _transform_to_analytical_sql(self, base_sql: str, patterns: Dict[str, Any]) -> str:
         """Transform base SQL to analytical SQL"""
         # Add analytical enhancements based on identified patterns
         analytical_sql = base_sql
@@ -485,7 +556,7 @@ class QueryAgent(BaseAgent):
         
         return analytical_sql
     
-    async def _match_query_template(self, query_text: str) -> Optional[Dict[str, Any]]:
+    def _match_query_template(self, query_text: str) -> Optional[Dict[str, Any]]:
         """Match query against predefined templates"""
         query_lower = query_text.lower()
         
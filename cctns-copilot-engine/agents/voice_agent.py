@@ -2,6 +2,7 @@
 Voice Agent for handling speech-to-text and voice processing
 """
 import asyncio
+import time
 import librosa
 import numpy as np
 from pathlib import Path
@@ -18,6 +19,8 @@ except ImportError:
         def __init__(self, config): pass
         async def transcribe_audio(self, *args, **kwargs): 
             return {"text": "transcription placeholder", "confidence": 0.8}
+        async def transcribe_audio_streaming(self, *args, **kwargs):
+            yield {"text": "transcription placeholder", "confidence": 0.8}
     
     class TextProcessor:
         def __init__(self, config): pass
@@ -96,49 +99,62 @@ class VoiceAgent(BaseAgent):
         
         self.logger.info(f"🎤 Processing audio file: {audio_path}")
         
+        enhancement_tasks = []
         try:
             # Step 1: Validate audio file
             audio_info = await self._get_audio_info(audio_path)
             if audio_info["duration"] > self.max_audio_duration:
                 raise ValueError(f"Audio too long: {audio_info['duration']}s (max: {self.max_audio_duration}s)")
             
-            # Step 2: Speech-to-Text
-            stt_result = await self.stt_processor.transcribe_audio(audio_path, language)
+            # Step 2: Speech-to-Text, enhancing each segment while later ones decode
+            start_time = time.perf_counter()
+            segments = []
+            async for segment in self.stt_processor.transcribe_audio_streaming(audio_path, language):
+                segments.append(segment)
+                if enhance_text and segment.get("text"):
+                    enhancement_tasks.append(asyncio.create_task(
+                        self.text_processor.enhance_text(segment["text"], language=language)
+                    ))
             
-            if stt_result.get("confidence", 0) < self.confidence_threshold:
-                self.logger.warning(f"⚠️ Low confidence transcription: {stt_result.get('confidence')}")
+            # Step 3: Text Enhancement (optional) - results come back in segment order
+            enhanced_parts = await asyncio.gather(*enhancement_tasks)
+            processing_time = time.perf_counter() - start_time
             
-            transcribed_text = stt_result.get("text", "")
+            transcribed_text = " ".join(segment.get("text", "") for segment in segments).strip()
+            confidence = (
+                sum(segment.get("confidence", 0.0) for segment in segments) / len(segments)
+                if segments else 0.0
+            )
             
-            # Step 3: Text Enhancement (optional)
-            enhanced_result = {}
-            if enhance_text and transcribed_text:
-                enhanced_result = await self.text_processor.enhance_text(
-                    transcribed_text, 
-                    language=language
-                )
+            if confidence < self.confidence_threshold:
+                self.logger.warning(f"⚠️ Low confidence transcription: {confidence}")
             
             # Step 4: Language Detection (if auto)
             detected_language = language
             if language == "auto":
-                detected_language = stt_result.get("detected_language", "en")
+                detected_language = segments[0].get("language", "en") if segments else "en"
             
             result = {
                 "transcription": {
                     "text": transcribed_text,
-                    "confidence": stt_result.get("confidence", 0.0),
+                    "confidence": confidence,
                     "language": detected_language,
-                    "segments": stt_result.get("segments", [])
+                    "segments": segments
                 },
                 "audio_info": audio_info,
-                "processing_time": stt_result.get("processing_time", 0.0)
+                "processing_time": processing_time
             }
             
-            if enhanced_result:
+            if enhanced_parts:
+                text_parts = [segment["text"] for segment in segments if segment.get("text")]
                 result["enhancement"] = {
-                    "enhanced_text": enhanced_result.get("enhanced_text", transcribed_text),
-                    "corrections": enhanced_result.get("corrections", []),
-                    "grammar_score": enhanced_result.get("grammar_score", 0.0)
+                    "enhanced_text": " ".join(
+                        part.get("enhanced_text", text) for part, text in zip(enhanced_parts, text_parts)
+                    ),
+                    "corrections": [
+                        correction for part in enhanced_parts for correction in part.get("corrections", [])
+                    ],
+                    "grammar_score": sum(part.get("grammar_score", 0.0) for part in enhanced_parts) / len(enhanced_parts)
                 }
             
             # Context updates for other agents
@@ -152,6 +168,8 @@ class VoiceAgent(BaseAgent):
             
         except Exception as e:
             self.logger.error(f"❌ Audio processing failed: {e}")
+            for task in enhancement_tasks:
+                task.cancel()
             raise
     
     async def _process_audio_stream(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
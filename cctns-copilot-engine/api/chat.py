@@ -8,6 +8,7 @@ from typing import Dict, Any, List, Optional
 import json
 import asyncio
 import logging
+import time
 from datetime import datetime
 import uuid
 
@@ -109,7 +110,7 @@ async def startup_chat_service():
     
     try:
         # Load configuration
-        config = {}  # Would load from config file
+        config = {"deep_validate": settings.STRICT_SQL_PARSE}  # Would load from config file
         
         # Initialize agents
         conversation_agent = ConversationAgent(config)
@@ -178,7 +179,7 @@ async def send_chat_message(
 ) -> ChatResponse:
     """Send a message in a chat session"""
     
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
     try:
         # Generate session ID if not provided
@@ -193,7 +194,7 @@ async def send_chat_message(
         else:
             response = await _process_text_message(request, current_user)
         
-        processing_time = (datetime.now() - start_time).total_seconds()
+        processing_time = time.perf_counter() - start_time
         
         # Send to WebSocket if connected
         if request.session_id in manager.session_connections:
@@ -214,7 +215,7 @@ async def send_chat_message(
             response=f"I'm sorry, I encountered an error: {str(e)}",
             response_type="error",
             timestamp=datetime.now().isoformat(),
-            processing_time=(datetime.now() - start_time).total_seconds()
+            processing_time=time.perf_counter() - start_time
         )
         
         return error_response
@@ -1,13 +1,22 @@
 """
 CCTNS Copilot Engine API - Main Application
 """
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 import logging
+import asyncio
+import hashlib
+import tempfile
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal
 from pathlib import Path
-import yaml
+from typing import Any, Dict, Optional
+import aiofiles
+import orjson
 import sys
 import os
 
@@ -15,6 +24,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config.settings import settings
+from config.loader import load_models_config
 
 # Configure logging
 logging.basicConfig(
@@ -30,10 +40,29 @@ logger = logging.getLogger(__name__)
 # Ensure logs directory exists
 Path("logs").mkdir(exist_ok=True)
 
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+def _json_default(value: Any) -> Any:
+    """Serialize types orjson does not handle natively"""
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class CopilotJSONResponse(ORJSONResponse):
+    """orjson response that also accepts Oracle NUMBER (Decimal) and numpy values"""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+        )
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
-    description="AI-powered copilot for CCTNS database queries"
+    description="AI-powered copilot for CCTNS database queries",
+    default_response_class=CopilotJSONResponse
 )
 
 # CORS middleware
@@ -52,78 +81,122 @@ static_dir.mkdir(parents=True, exist_ok=True)
 # Static files
 app.mount("/static", StaticFiles(directory="web/static"), name="static")
 
-# Global components
-stt_processor = None
-nl2sql_processor = None
-sql_executor = None
-report_generator = None
+# Uploads are streamed to disk in chunks of this size
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+@dataclass
+class AppState:
+    """Components shared by all requests in this worker, built on first use"""
+    config: Dict[str, Any]
+    components: Dict[str, Any] = field(default_factory=dict)
+    locks: Dict[str, asyncio.Lock] = field(default_factory=lambda: defaultdict(asyncio.Lock))
+    nl2sql_batcher: Optional[Any] = None
+    warmup_task: Optional[asyncio.Task] = None
+
+def _create_stt_processor(config: Dict[str, Any]):
+    from models.stt_processor import IndianSTTProcessor
+    return IndianSTTProcessor(config.get("speech_to_text", {}))
+
+def _create_nl2sql_processor(config: Dict[str, Any]):
+    from models.nl2sql_processor import NL2SQLProcessor
+    return NL2SQLProcessor(config.get("cctns_schema", {}))
+
+def _create_sql_executor(config: Dict[str, Any]):
+    from models.sql_executor import SQLExecutor
+    return SQLExecutor(
+        settings.ORACLE_CONNECTION_STRING,
+        result_cache_size=settings.SQL_RESULT_CACHE_SIZE,
+        result_cache_ttl=settings.SQL_RESULT_CACHE_TTL,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        query_timeout=settings.SQL_TIMEOUT
+    )
+
+def _create_report_generator(config: Dict[str, Any]):
+    from models.report_generator import ReportGenerator
+    return ReportGenerator(config.get("summarization", {}))
+
+COMPONENT_FACTORIES = {
+    "stt_processor": _create_stt_processor,
+    "nl2sql_processor": _create_nl2sql_processor,
+    "sql_executor": _create_sql_executor,
+    "report_generator": _create_report_generator
+}
+
+async def get_component(request: Request, name: str) -> Optional[Any]:
+    """Get a shared component, constructing it once on first use"""
+    return await _get_state_component(request.app.state.copilot, name)
+
+async def _get_state_component(state: AppState, name: str) -> Optional[Any]:
+    """Get a component from the worker state, constructing it once on first use"""
+    component = state.components.get(name)
+    if component is not None:
+        return component
+    
+    async with state.locks[name]:
+        # Another request may have finished construction while we waited
+        if name not in state.components:
+            try:
+                # Model loading is blocking - keep it off the event loop
+                state.components[name] = await asyncio.to_thread(COMPONENT_FACTORIES[name], state.config)
+                logger.info(f"✅ {name} initialized")
+            except Exception as e:
+                logger.error(f"❌ {name} initialization failed: {e}")
+                return None
+    
+    return state.components[name]
+
+async def get_nl2sql_batcher(request: Request):
+    """Get the micro-batcher in front of the shared NL2SQL processor"""
+    state: AppState = request.app.state.copilot
+    
+    if state.nl2sql_batcher is None:
+        nl2sql_processor = await get_component(request, "nl2sql_processor")
+        if nl2sql_processor is None:
+            return None
+        
+        if state.nl2sql_batcher is None:
+            from models.batching import MicroBatcher
+            state.nl2sql_batcher = MicroBatcher(
+                nl2sql_processor.generate_sql_batch,
+                max_batch=settings.NL2SQL_BATCH_SIZE,
+                max_wait=settings.NL2SQL_BATCH_TIMEOUT_MS / 1000
+            )
+    
+    return state.nl2sql_batcher
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize components on startup"""
-    global stt_processor, nl2sql_processor, sql_executor, report_generator
+    """Set up shared state on startup; components are built on first use"""
+    logger.info("🚀 Starting CCTNS Copilot Engine...")
     
+    app.state.copilot = AppState(config=MODELS_CONFIG)
+    
+    # Open database connections in the background so the first query doesn't pay for them
+    app.state.copilot.warmup_task = asyncio.create_task(_warm_up_sql_executor(app.state.copilot))
+    logger.info("🚀 CCTNS Copilot Engine started successfully")
+
+async def _warm_up_sql_executor(state: AppState):
+    """Build the SQL executor and fill its connection pool"""
     try:
-        logger.info("🚀 Starting CCTNS Copilot Engine...")
-        
-        # Load configuration with proper error handling
-        config_path = Path("config/models_config.yaml")
-        if not config_path.exists():
-            config_path = Path("config/models_config.yml")
-        
-        if config_path.exists():
-            with open(config_path, "r") as f:
-                config = yaml.safe_load(f)
-            logger.info(f"✅ Loaded configuration from {config_path}")
-        else:
-            logger.warning("⚠️ No models config file found, using defaults")
-            config = _get_default_config()
-        
-        # Import models with error handling
-        try:
-            from models.stt_processor import IndianSTTProcessor
-            from models.nl2sql_processor import NL2SQLProcessor
-            from models.sql_executor import SQLExecutor
-            from models.report_generator import ReportGenerator
-        except ImportError as e:
-            logger.error(f"❌ Failed to import models: {e}")
-            logger.info("📦 Please ensure all model files are created")
-            return
-        
-        # Initialize processors with error handling
-        try:
-            stt_processor = IndianSTTProcessor(config.get("speech_to_text", {}))
-            logger.info("✅ STT Processor initialized")
-        except Exception as e:
-            logger.error(f"❌ STT Processor initialization failed: {e}")
-            stt_processor = None
-        
-        try:
-            nl2sql_processor = NL2SQLProcessor(config.get("cctns_schema", {}))
-            logger.info("✅ NL2SQL Processor initialized")
-        except Exception as e:
-            logger.error(f"❌ NL2SQL Processor initialization failed: {e}")
-            nl2sql_processor = None
-        
-        try:
-            sql_executor = SQLExecutor(settings.ORACLE_CONNECTION_STRING)
-            logger.info("✅ SQL Executor initialized")
-        except Exception as e:
-            logger.error(f"❌ SQL Executor initialization failed: {e}")
-            sql_executor = None
-        
-        try:
-            report_generator = ReportGenerator(config.get("summarization", {}))
-            logger.info("✅ Report Generator initialized")
-        except Exception as e:
-            logger.error(f"❌ Report Generator initialization failed: {e}")
-            report_generator = None
-        
-        logger.info("🚀 CCTNS Copilot Engine started successfully")
-        
+        sql_executor = await _get_state_component(state, "sql_executor")
+        if sql_executor is not None:
+            await sql_executor.warm_up()
+            logger.info("✅ sql_executor warmed up")
     except Exception as e:
-        logger.error(f"❌ Startup failed: {e}")
-        logger.warning("⚠️ Some components failed to initialize - server starting with limited functionality")
+        logger.warning(f"⚠️ sql_executor warm-up failed: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers and close database pools on shutdown"""
+    state: Optional[AppState] = getattr(app.state, "copilot", None)
+    if state and state.warmup_task:
+        state.warmup_task.cancel()
+    if state and state.nl2sql_batcher:
+        await state.nl2sql_batcher.stop()
+    
+    sql_executor = state.components.get("sql_executor") if state else None
+    if sql_executor is not None and hasattr(sql_executor, "close"):
+        await sql_executor.close()
 
 def _get_default_config():
     """Return default configuration when config file is not available"""
@@ -153,18 +226,33 @@ def _get_default_config():
         }
     }
 
+def _load_config() -> Dict[str, Any]:
+    """Load models configuration, falling back to defaults"""
+    try:
+        config = load_models_config()
+        if config is not None:
+            logger.info("✅ Loaded models configuration")
+            return config
+        logger.warning("⚠️ No models config file found, using defaults")
+    except Exception as e:
+        logger.error(f"❌ Failed to load configuration: {e}")
+        logger.warning("⚠️ Falling back to default configuration")
+    return _get_default_config()
+
+# Parsed at import so workers forked from a preloaded app share it
+MODELS_CONFIG = _load_config()
+
 # Health check endpoint
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint"""
+    state: AppState = request.app.state.copilot
     return {
         "status": "healthy",
         "version": settings.VERSION,
+        # Components are built lazily - False means not loaded yet (or failed to load)
         "components": {
-            "stt_processor": stt_processor is not None,
-            "nl2sql_processor": nl2sql_processor is not None,
-            "sql_executor": sql_executor is not None,
-            "report_generator": report_generator is not None
+            name: name in state.components for name in COMPONENT_FACTORIES
         }
     }
 from fastapi.responses import FileResponse
@@ -196,33 +284,41 @@ async def root():
 #     }
 
 @app.post("/api/voice/transcribe")
-async def transcribe_voice(file: UploadFile = File(...), language: str = "te"):
+async def transcribe_voice(request: Request, file: UploadFile = File(...), language: str = "te"):
     """Transcribe voice input to text"""
+    file_path = None
+    
     try:
+        stt_processor = await get_component(request, "stt_processor")
         if not stt_processor:
             raise HTTPException(status_code=503, detail="STT Processor not available")
         
-        # Save uploaded file
-        file_path = f"temp/{file.filename}"
-        Path("temp").mkdir(exist_ok=True)
+        # Stream uploaded file to a private temp file without buffering it in memory
+        fd, file_path = tempfile.mkstemp(suffix=Path(file.filename or "").suffix)
+        os.close(fd)
         
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # Hash while writing so a re-sent clip can reuse its decoded audio
+        digest = hashlib.blake2b(digest_size=16)
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                await buffer.write(chunk)
         
         # Transcribe
-        result = await stt_processor.transcribe_audio(file_path, language)
-        
-        # Cleanup
-        Path(file_path).unlink(missing_ok=True)
-        
-        return result
+        return await stt_processor.transcribe_audio(file_path, language, digest.hexdigest())
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    finally:
+        # Cleanup off the event loop
+        if file_path:
+            await asyncio.to_thread(Path(file_path).unlink, missing_ok=True)
 
 @app.post("/api/query/process")
-async def process_query(query: dict):
+async def process_query(request: Request, query: dict):
     """Process natural language query end-to-end"""
     try:
         text = query.get("text", "")
@@ -230,17 +326,36 @@ async def process_query(query: dict):
             raise HTTPException(status_code=400, detail="No query text provided")
         
         # Generate SQL
-        if nl2sql_processor:
-            sql_result = await nl2sql_processor.generate_sql(text)
+        nl2sql_batcher = await get_nl2sql_batcher(request)
+        if nl2sql_batcher:
+            sql_result = await nl2sql_batcher.submit(text)
             if not sql_result.get("valid"):
                 return {"error": "Could not generate valid SQL", "suggestion": "Try rephrasing your query"}
             
             # Execute SQL if executor is available
+            sql_executor = await get_component(request, "sql_executor")
             if sql_executor:
-                execution_result = await sql_executor.execute_query(sql_result["sql"])
+                result_format = query.get("format")
+                wants_arrow = result_format == "arrow" or ARROW_STREAM_MEDIA_TYPE in request.headers.get("accept", "")
+                execution_result = await sql_executor.execute_query(
+                    sql_result["sql"],
+                    sql_result.get("binds"),
+                    columnar=result_format == "columnar",
+                    arrow=wants_arrow
+                )
+                
+                # Arrow results go out as an IPC stream, never through JSON
+                table = execution_result.get("table")
+                if table is not None:
+                    return Response(
+                        content=sql_executor.to_arrow_stream(table),
+                        media_type=ARROW_STREAM_MEDIA_TYPE
+                    )
+                
                 return {
                     "query": text,
                     "sql": sql_result["sql"],
+                    "binds": sql_result.get("binds", {}),
                     "results": execution_result,
                     "success": True
                 }
@@ -248,14 +363,19 @@ async def process_query(query: dict):
                 return {
                     "query": text,
                     "sql": sql_result["sql"],
+                    "binds": sql_result.get("binds", {}),
                     "message": "SQL generated but executor not available",
                     "success": True
                 }
         else:
             return {"error": "NL2SQL processor not available"}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
-    uvicorn.run(app, host=settings.HOST, port=settings.PORT)
\ No newline at end of file
+    # Single worker: models are loaded once per process, so extra workers would duplicate them;
+    # run.py honours WORKERS for multi-process deployments
+    uvicorn.run(app, host=settings.HOST, port=settings.PORT, workers=1)
\ No newline at end of file
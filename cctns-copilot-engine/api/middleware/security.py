@@ -3,6 +3,7 @@ Security middleware for CCTNS API
 """
 from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
+import re
 import time
 import logging
 from typing import Dict, Set
@@ -12,6 +13,42 @@ import ipaddress
 
 logger = logging.getLogger(__name__)
 
+# Request screening runs on every call; use RE2's automaton-based matcher when installed
+try:
+    import re2 as _pattern_engine
+except ImportError:
+    _pattern_engine = re
+
+# SQL injection patterns
+_SQL_PATTERNS = [
+    "union select", "drop table", "insert into", "update set",
+    "delete from", "create table", "alter table", "--", "/*",
+    "xp_cmdshell", "sp_executesql"
+]
+
+# XSS patterns
+_XSS_PATTERNS = [
+    "<script", "javascript:", "onerror=", "onload=",
+    "alert(", "confirm(", "prompt("
+]
+
+# Path traversal patterns
+_TRAVERSAL_PATTERNS = [
+    "../", "..\\", "..", "\\x2e\\x2e", "%2e%2e"
+]
+
+_SUSPICIOUS_AGENTS = [
+    "sqlmap", "nikto", "nmap", "masscan", "zap", "burp",
+    "python-requests", "curl", "wget", "scanner"
+]
+
+def _compile_literals(patterns):
+    """Compile literal patterns into one alternation scanned in a single pass"""
+    return _pattern_engine.compile('|'.join(map(re.escape, patterns)))
+
+_SUSPICIOUS_REQUEST_RE = _compile_literals(_SQL_PATTERNS + _XSS_PATTERNS + _TRAVERSAL_PATTERNS)
+_SUSPICIOUS_AGENT_RE = _compile_literals(_SUSPICIOUS_AGENTS)
+
 class SecurityMiddleware:
     """Security middleware for API protection"""
     
@@ -34,7 +71,7 @@ class SecurityMiddleware:
     
     async def __call__(self, request: Request, call_next):
         """Main middleware function"""
-        start_time = time.time()
+        start_time = time.perf_counter()
         client_ip = self._get_client_ip(request)
         
         self.request_stats["total_requests"] += 1
@@ -67,7 +104,7 @@ class SecurityMiddleware:
             self._add_security_headers(response)
             
             # Log request
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             await self._log_request(request, response, client_ip, processing_time)
             
             return response
@@ -159,44 +196,18 @@ class SecurityMiddleware:
         path = str(request.url.path).lower()
         query = str(request.url.query).lower()
         
-        # SQL injection patterns
-        sql_patterns = [
-            "union select", "drop table", "insert into", "update set",
-            "delete from", "create table", "alter table", "--", "/*",
-            "xp_cmdshell", "sp_executesql"
-        ]
-        
-        # XSS patterns
-        xss_patterns = [
-            "<script", "javascript:", "onerror=", "onload=",
-            "alert(", "confirm(", "prompt("
-        ]
-        
-        # Path traversal patterns
-        traversal_patterns = [
-            "../", "..\\", "..", "\\x2e\\x2e", "%2e%2e"
-        ]
-        
-        # Check all patterns
-        all_patterns = sql_patterns + xss_patterns + traversal_patterns
+        # Check SQL injection, XSS and path traversal patterns in one scan
         content = path + " " + query
-        
-        for pattern in all_patterns:
-            if pattern in content:
-                logger.warning(f"🚨 Suspicious pattern detected: {pattern} in {request.url}")
-                return True
+        match = _SUSPICIOUS_REQUEST_RE.search(content)
+        if match:
+            logger.warning(f"🚨 Suspicious pattern detected: {match.group(0)} in {request.url}")
+            return True
         
         return False
     
     def _is_suspicious_user_agent(self, user_agent: str) -> bool:
         """Check for suspicious user agents"""
-        suspicious_agents = [
-            "sqlmap", "nikto", "nmap", "masscan", "zap", "burp",
-            "python-requests", "curl", "wget", "scanner"
-        ]
-        
-        user_agent_lower = user_agent.lower()
-        return any(agent in user_agent_lower for agent in suspicious_agents)
+        return _SUSPICIOUS_AGENT_RE.search(user_agent.lower()) is not None
     
     def _add_security_headers(self, response):
         """Add security headers to response"""
@@ -50,6 +50,7 @@ class QueryResponse(BaseModel):
     original_query: str
     processed_query: Optional[str] = None
     sql: str
+    binds: Dict[str, Any] = {}
     valid: bool
     executed: bool = False
     results: Optional[List[Dict[str, Any]]] = None
@@ -118,7 +119,7 @@ async def process_natural_language_query(request: QueryRequest):
     - **limit**: Maximum number of results to return
     """
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     query_id = f"query_{uuid.uuid4().hex[:8]}"
     
     try:
@@ -138,6 +139,7 @@ async def process_natural_language_query(request: QueryRequest):
             original_query=request.text,
             processed_query=processed_text,
             sql=sql_result.get("sql", ""),
+            binds=sql_result.get("binds", {}),
             valid=sql_result.get("valid", False)
         )
         
@@ -160,11 +162,11 @@ async def process_natural_language_query(request: QueryRequest):
                 else:
                     limited_sql = response.sql + f" FETCH FIRST {request.limit} ROWS ONLY"
             
-            exec_result = await sql_exec.execute_sql(limited_sql)
+            exec_result = await sql_exec.execute_query(limited_sql, response.binds)
             
             response.executed = exec_result.get("success", False)
             if response.executed:
-                response.results = exec_result.get("results", [])
+                response.results = exec_result.get("data", [])
                 response.row_count = exec_result.get("row_count", 0)
                 
                 # Add execution warnings
@@ -172,7 +174,7 @@ async def process_natural_language_query(request: QueryRequest):
                     response.warnings = []
                 response.warnings.extend(exec_result.get("warnings", []))
             else:
-                response.errors = exec_result.get("errors", ["Query execution failed"])
+                response.errors = [exec_result.get("error", "Query execution failed")]
         
         # Get query explanation if requested
         if request.explain and response.valid:
@@ -183,7 +185,7 @@ async def process_natural_language_query(request: QueryRequest):
             except Exception as e:
                 logger.warning(f"Query explanation failed: {e}")
         
-        response.execution_time = time.time() - start_time
+        response.execution_time = time.perf_counter() - start_time
         
         return response
         
@@ -15,6 +15,7 @@ import io
 
 from agents.execution_agent import ExecutionAgent
 from agents.visualization_agent import VisualizationAgent
+from models.nl2sql_processor import _TODAY_RANGE, _WRAPPED_INCIDENT_DATE_RE
 from api.middleware.auth import AuthMiddleware
 from config.settings import settings
 
@@ -962,18 +963,29 @@ async def _generate_xlsx_report(file_path: Path, request: ReportRequest, data: L
         summary_df = pd.DataFrame(summary_data)
         summary_df.to_excel(writer, sheet_name='Summary', index=False)
 
+def _current_db_type() -> str:
+    """Backend the report queries run against"""
+    sql_executor = getattr(execution_agent, "sql_executor", None)
+    db_type = getattr(sql_executor, "db_type", None)
+    if db_type:
+        return db_type
+    return "sqlite" if settings.ORACLE_CONNECTION_STRING.startswith("sqlite") else "oracle"
+
 async def _get_quick_report_config(report_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
     """Get configuration for quick report"""
     
+    today_start, tomorrow_start = _TODAY_RANGE.get(_current_db_type(), _TODAY_RANGE["oracle"])
+    
     configs = {
         "daily_summary": {
-            "query": """
+            "query": f"""
                 SELECT 
                     COUNT(*) as total_firs,
                     COUNT(CASE WHEN status = 'OPEN' THEN 1 END) as open_firs,
                     COUNT(CASE WHEN status = 'CLOSED' THEN 1 END) as closed_firs
                 FROM FIR 
-                WHERE DATE(incident_date) = CURRENT_DATE
+                WHERE incident_date >= {today_start}
+                  AND incident_date < {tomorrow_start}
             """,
             "report_type": "summary",
             "include_charts": True
@@ -1073,6 +1085,9 @@ async def _get_quick_report_config(report_name: str, parameters: Dict[str, Any])
         else:
             query += f" WHERE f.status = '{status}'"
     
+    if _WRAPPED_INCIDENT_DATE_RE.search(query):
+        raise ValueError(f"Report query for {report_name} wraps incident_date in DATE(); use a date range")
+    
     # Update the query in config
     if query != config.get("query", ""):
         config["query"] = query
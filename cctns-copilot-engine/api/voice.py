@@ -8,8 +8,9 @@ import logging
 import os
 import tempfile
 import asyncio
+import hashlib
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import aiofiles
 import mimetypes
 from datetime import datetime
@@ -36,6 +37,7 @@ text_processor: Optional[TextProcessor] = None
 # Configuration
 UPLOAD_DIR = "temp/audio"
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
 SUPPORTED_FORMATS = {
     "audio/wav": ".wav",
     "audio/mpeg": ".mp3", 
@@ -118,8 +120,8 @@ def validate_audio_file(file: UploadFile) -> Dict[str, Any]:
     
     return validation
 
-async def save_uploaded_file(file: UploadFile) -> str:
-    """Save uploaded file and return path"""
+async def save_uploaded_file(file: UploadFile) -> Tuple[str, str]:
+    """Save uploaded file and return its path and content digest"""
     # Create upload directory
     os.makedirs(UPLOAD_DIR, exist_ok=True)
     
@@ -130,12 +132,14 @@ async def save_uploaded_file(file: UploadFile) -> str:
     temp_filename = f"{original_name}_{timestamp}{extension}"
     temp_path = os.path.join(UPLOAD_DIR, temp_filename)
     
-    # Save file
+    # Save file, hashing as it streams so a re-sent clip can reuse its decoded audio
+    digest = hashlib.blake2b(digest_size=16)
     async with aiofiles.open(temp_path, 'wb') as f:
-        content = await file.read()
-        await f.write(content)
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            digest.update(chunk)
+            await f.write(chunk)
     
-    return temp_path
+    return temp_path, digest.hexdigest()
 
 @router.post("/transcribe")
 async def transcribe_audio(
@@ -167,7 +171,7 @@ async def transcribe_audio(
             raise HTTPException(status_code=400, detail=validation["errors"])
         
         # Save uploaded file
-        temp_path = await save_uploaded_file(file)
+        temp_path, audio_digest = await save_uploaded_file(file)
         
         # Get file info
         file_size = os.path.getsize(temp_path)
@@ -175,7 +179,7 @@ async def transcribe_audio(
         logger.info(f"Processing audio file: {file.filename} ({file_size} bytes)")
         
         # Transcribe audio
-        transcription_result = await stt.transcribe_audio(temp_path, language)
+        transcription_result = await stt.transcribe_audio(temp_path, language, audio_digest)
         
         if not transcription_result.get("text"):
             return {
@@ -292,10 +296,10 @@ async def transcribe_batch(
                     continue
                 
                 # Save and transcribe
-                temp_path = await save_uploaded_file(file)
+                temp_path, audio_digest = await save_uploaded_file(file)
                 temp_paths.append(temp_path)
                 
-                transcription_result = await stt.transcribe_audio(temp_path, language)
+                transcription_result = await stt.transcribe_audio(temp_path, language, audio_digest)
                 
                 if transcription_result.get("text"):
                     text = transcription_result["text"]
@@ -396,9 +400,10 @@ async def transcribe_from_url(
             
             with open(temp_path, 'wb') as f:
                 f.write(response.content)
+            audio_digest = hashlib.blake2b(response.content, digest_size=16).hexdigest()
         
         # Transcribe
-        transcription_result = await stt.transcribe_audio(temp_path, language)
+        transcription_result = await stt.transcribe_audio(temp_path, language, audio_digest)
         
         if not transcription_result.get("text"):
             return {
@@ -4,8 +4,9 @@ Configuration package for CCTNS Copilot Engine
 
 from .settings import settings
 from .database import DatabaseConfig
+from .loader import load_models_config
 
-__all__ = ["settings", "DatabaseConfig"]
+__all__ = ["settings", "DatabaseConfig", "load_models_config"]
 
 # Version info
 __version__ = "1.0.0"
@@ -3,11 +3,16 @@ Database configuration and connection management for CCTNS Oracle database
 """
 
 import os
+import hashlib
 import logging
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
-import cx_Oracle
-from sqlalchemy import create_engine, MetaData, inspect
+from sqlalchemy import create_engine, event, MetaData, inspect, text
 from sqlalchemy.pool import QueuePool
 from .settings import settings
 
@@ -28,11 +33,14 @@ class DatabaseConfig:
     pool_size: int = 10
     max_overflow: int = 20
     pool_timeout: int = 30
-    pool_recycle: int = 3600
+    pool_recycle: int = 1800
     
     # Query settings
     query_timeout: int = 30
     max_results: int = 1000
+    statement_cache_size: int = 40
+    fetch_array_size: int = 500
+    schema_cache_ttl: int = 86400
     
     # Security settings
     enable_ssl: bool = False
@@ -50,9 +58,12 @@ class DatabaseConfig:
             pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
             max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
             pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
-            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "3600")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
             query_timeout=int(os.getenv("DB_QUERY_TIMEOUT", "30")),
             max_results=int(os.getenv("DB_MAX_RESULTS", "1000")),
+            statement_cache_size=int(os.getenv("DB_STATEMENT_CACHE_SIZE", "40")),
+            fetch_array_size=int(os.getenv("DB_FETCH_ARRAY_SIZE", "500")),
+            schema_cache_ttl=int(os.getenv("DB_SCHEMA_CACHE_TTL", "86400")),
             enable_ssl=os.getenv("DB_ENABLE_SSL", "false").lower() == "true",
             ssl_cert_path=os.getenv("DB_SSL_CERT_PATH")
         )
@@ -69,7 +80,7 @@ class DatabaseConfig:
             protocol = "tcp"
             
         dsn = f"(DESCRIPTION=(ADDRESS=(PROTOCOL={protocol})(HOST={self.host})(PORT={self.port}))(CONNECT_DATA=(SERVICE_NAME={self.service_name})))"
-        return f"oracle+cx_oracle://{self.username}:{self.password}@{dsn}"
+        return f"oracle+oracledb://{self.username}:{self.password}@{dsn}"
     
     def create_engine(self):
         """Create SQLAlchemy engine with proper configuration"""
@@ -79,10 +90,28 @@ class DatabaseConfig:
             "pool_timeout": self.pool_timeout,
             "pool_recycle": self.pool_recycle,
             "poolclass": QueuePool,
+            # Stale connections are handled by pool_recycle, not a ping per checkout
+            "pool_pre_ping": False,
             "echo": settings.DEBUG
         }
         
-        return create_engine(self.connection_string, **engine_args)
+        connection_string = self.connection_string
+        if connection_string.startswith("oracle"):
+            # Reuse parsed cursors for repeated SQL and fetch rows in fewer round-trips
+            engine_args["connect_args"] = {"stmtcachesize": self.statement_cache_size}
+            engine_args["arraysize"] = self.fetch_array_size
+        
+        engine = create_engine(connection_string, **engine_args)
+        
+        if connection_string.startswith("oracle"):
+            call_timeout_ms = self.query_timeout * 1000
+            
+            @event.listens_for(engine, "connect")
+            def _set_session_options(dbapi_connection, connection_record):
+                # Once per physical connection rather than once per query
+                dbapi_connection.call_timeout = call_timeout_ms
+        
+        return engine
 
 class DatabaseManager:
     """Database connection and schema management"""
@@ -98,17 +127,26 @@ class DatabaseManager:
         try:
             self.engine = self.config.create_engine()
             
-            # Test connection
-            with self.engine.connect() as conn:
-                result = conn.execute("SELECT 1 FROM DUAL")
-                logger.info("Database connection established successfully")
-            
-            # Load metadata
-            self.metadata = MetaData()
-            self.metadata.reflect(bind=self.engine)
-            
-            # Cache table information
-            self._load_schema_cache()
+            # Open the whole pool up front, in parallel with the schema load, so the
+            # first requests don't each pay for connect and authentication
+            # (with no fixed pool size, just test a single connection)
+            pool_size = self.config.pool_size
+            warm_count = max(pool_size, 1)
+            barrier = threading.Barrier(pool_size) if pool_size > 0 else None
+            with ThreadPoolExecutor(max_workers=warm_count) as executor:
+                warmups = [executor.submit(self._warm_connection, barrier) for _ in range(warm_count)]
+                
+                # Load metadata and table information, from disk when a fresh copy exists
+                if not self._load_schema_from_disk():
+                    self.metadata = MetaData()
+                    self.metadata.reflect(bind=self.engine, only=self._is_cctns_table)
+                    self._load_schema_cache()
+                    self._save_schema_to_disk()
+                
+                # Connection failures surface here, as the old test query did
+                for warmup in warmups:
+                    warmup.result()
+            logger.info(f"Database connection established successfully ({warm_count} pooled connections)")
             
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
@@ -121,6 +159,8 @@ class DatabaseManager:
             
             # Cache table names and columns
             for table_name in inspector.get_table_names():
+                if not self._is_cctns_table(table_name):
+                    continue
                 columns = inspector.get_columns(table_name)
                 foreign_keys = inspector.get_foreign_keys(table_name)
                 
@@ -136,6 +176,67 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"Schema cache loading failed: {e}")
     
+    def _warm_connection(self, barrier: Optional[threading.Barrier]):
+        """Open and test one pooled connection, holding it until the rest are open"""
+        ping = "SELECT 1 FROM DUAL" if self.engine.dialect.name == "oracle" else "SELECT 1"
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text(ping))
+                # Held together so each worker checks out a distinct connection
+                if barrier is not None:
+                    barrier.wait(timeout=self.config.pool_timeout)
+        except threading.BrokenBarrierError:
+            pass
+        except Exception:
+            # Release the other workers instead of leaving them to time out
+            if barrier is not None:
+                barrier.abort()
+            raise
+    
+    @staticmethod
+    def _is_cctns_table(table_name: str, metadata: Optional[MetaData] = None) -> bool:
+        """Reflection filter: only the fixed CCTNS tables are introspected"""
+        return table_name.upper() in CCTNS_TABLES
+    
+    @property
+    def _schema_cache_path(self) -> Path:
+        # One file per database, so workers pointed at different databases don't collide
+        digest = hashlib.blake2b(self.config.connection_string.encode(), digest_size=8).hexdigest()
+        return Path(settings.MODELS_DIR) / f"schema_{digest}.pkl"
+    
+    def _load_schema_from_disk(self) -> bool:
+        """Restore reflected metadata saved by a previous start, if still fresh"""
+        path = self._schema_cache_path
+        if self.config.schema_cache_ttl <= 0 or not path.exists():
+            return False
+        if path.stat().st_mtime < time.time() - self.config.schema_cache_ttl:
+            return False
+        
+        try:
+            with open(path, "rb") as f:
+                self.metadata, self._schema_cache = pickle.load(f)
+            logger.info(f"Schema loaded from {path} for {len(self._schema_cache)} tables")
+            return True
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable schema cache {path}: {e}")
+            return False
+    
+    def _save_schema_to_disk(self):
+        """Persist reflected metadata so later worker starts skip introspection"""
+        if self.config.schema_cache_ttl <= 0:
+            return
+        
+        path = self._schema_cache_path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump((self.metadata, self._schema_cache), f)
+            # Atomic swap; concurrent workers never read a half-written file
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not write schema cache {path}: {e}")
+    
     def get_table_info(self, table_name: str) -> Dict[str, Any]:
         """Get cached table information"""
         return self._schema_cache.get(table_name.upper(), {})
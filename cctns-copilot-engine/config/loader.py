@@ -0,0 +1,56 @@
+"""
+Models configuration loader with a pickled parse cache
+"""
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATHS = [Path("config/models_config.yaml"), Path("config/models_config.yml")]
+
+def load_models_config(config_path: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """
+    Load the models configuration YAML
+    
+    The parsed result is pickled next to the YAML file, keyed by its mtime, so
+    later process starts skip the YAML parse until the file changes.
+    
+    Args:
+        config_path: Explicit config file; defaults to config/models_config.yaml (or .yml)
+        
+    Returns:
+        Parsed configuration, or None if no config file exists
+    """
+    candidates = [Path(config_path)] if config_path else DEFAULT_CONFIG_PATHS
+    config_path = next((path for path in candidates if path.exists()), None)
+    if config_path is None:
+        return None
+    
+    cache_path = config_path.with_name(f"{config_path.name}.{config_path.stat().st_mtime_ns}.pkl")
+    if cache_path.exists():
+        try:
+            with open(cache_path, "rb") as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable config cache {cache_path}: {e}")
+    
+    import yaml
+    with open(config_path, "r") as f:
+        config = yaml.safe_load(f)
+    
+    try:
+        for stale_cache in config_path.parent.glob(f"{config_path.name}.*.pkl"):
+            if stale_cache != cache_path:
+                stale_cache.unlink(missing_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Atomic swap; concurrent workers never read a half-written file
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.debug(f"Could not write config cache {cache_path}: {e}")
+    
+    return config
@@ -49,6 +49,11 @@ class Settings:
         self.NL2SQL_MODEL = os.getenv("NL2SQL_MODEL", "microsoft/CodeT5-base")
         self.SQL_TIMEOUT = int(os.getenv("SQL_TIMEOUT", "30"))
         self.SQL_MAX_RESULTS = int(os.getenv("SQL_MAX_RESULTS", "1000"))
+        self.SQL_RESULT_CACHE_SIZE = int(os.getenv("SQL_RESULT_CACHE_SIZE", "256"))
+        self.SQL_RESULT_CACHE_TTL = int(os.getenv("SQL_RESULT_CACHE_TTL", "60"))
+        self.STRICT_SQL_PARSE = os.getenv("STRICT_SQL_PARSE", "false").lower() == "true"
+        self.NL2SQL_BATCH_SIZE = int(os.getenv("NL2SQL_BATCH_SIZE", "8"))
+        self.NL2SQL_BATCH_TIMEOUT_MS = int(os.getenv("NL2SQL_BATCH_TIMEOUT_MS", "15"))
         
         # Report Generation
         self.SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "google/pegasus-cnn_dailymail")
@@ -70,8 +75,10 @@ class Settings:
         self.MAX_FILE_SIZE = os.getenv("MAX_FILE_SIZE", "50MB")
         self.ALLOWED_AUDIO_FORMATS = os.getenv("ALLOWED_AUDIO_FORMATS", "wav,mp3,m4a,ogg")
         
-        # Initialize directories
-        self._create_directories()
+        # Initialize directories (run.py creates them up front and sets SKIP_DIR_BOOTSTRAP)
+        self.SKIP_DIR_BOOTSTRAP = os.getenv("SKIP_DIR_BOOTSTRAP", "false").lower() == "true"
+        if not self.SKIP_DIR_BOOTSTRAP:
+            self._create_directories()
         
         # Load .env file if exists
         self._load_env_file()
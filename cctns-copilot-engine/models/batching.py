@@ -0,0 +1,84 @@
+"""
+Async micro-batching for model processors
+"""
+import logging
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """Coalesce concurrent single-item requests into batched processor calls"""
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch: int = 8,
+        max_wait: float = 0.015
+    ):
+        """
+        Args:
+            batch_fn: Coroutine taking a list of items and returning results in the same order
+            max_batch: Maximum number of items per batch
+            max_wait: Seconds to wait for more items once the first one arrives
+        """
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result"""
+        if self._worker is None or self._worker.done():
+            self._start()
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def stop(self):
+        """Stop the background worker"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def _start(self):
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def _run(self):
+        """Drain the queue into batches of up to max_batch items"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch: List[Tuple[Any, asyncio.Future]] = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = await self.batch_fn(items)
+            except Exception as e:
+                logger.error(f"❌ Batch of {len(items)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -4,10 +4,65 @@ Natural Language to SQL Processor
 import logging
 import asyncio
 import re
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Cheap structural check used instead of a full parse on the hot path
+_SQL_SHAPE = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+
+# Data-modifying statements, matched as whole words in one pass
+_DANGEROUS_RE = re.compile(r'\b(DROP|DELETE|UPDATE|INSERT|TRUNCATE|ALTER)\b', re.IGNORECASE)
+
+# DATE(incident_date) defeats the index on the column; date filters must be ranges
+_WRAPPED_INCIDENT_DATE_RE = re.compile(r'\bDATE\s*\(\s*(?:\w+\.)?incident_date\b', re.IGNORECASE)
+
+# Half-open "today" bounds per backend, so incident_date is compared bare and
+# its index stays usable
+_TODAY_RANGE = {
+    "sqlite": ("date('now')", "date('now', '+1 day')"),
+    "oracle": ("TRUNC(SYSDATE)", "TRUNC(SYSDATE) + 1")
+}
+
+# Static SQL templates, built once; varying values are passed as binds
+_SQL_SELECT_COLUMNS = {
+    'FIR': "SELECT fir_id, fir_number, incident_date, status FROM FIR",
+    'ARREST': "SELECT arrest_id, arrested_person_name, arrest_date FROM ARREST",
+    'OFFICER_MASTER': "SELECT officer_id, officer_name, rank FROM OFFICER_MASTER"
+}
+
+_SQL_TOP_OFFICERS = (
+    "SELECT o.officer_name, COUNT(a.arrest_id) as arrest_count\n"
+    "FROM OFFICER_MASTER o\n"
+    "LEFT JOIN ARREST a ON o.officer_id = a.officer_id\n"
+    "GROUP BY o.officer_name\n"
+    "ORDER BY arrest_count DESC"
+)
+
+_SQL_COMPARE_DISTRICTS = (
+    "SELECT d.district_name, COUNT(f.fir_id) as fir_count\n"
+    "FROM DISTRICT_MASTER d\n"
+    "LEFT JOIN FIR f ON d.district_id = f.district_id\n"
+    "WHERE d.district_name IN (:district1, :district2)\n"
+    "GROUP BY d.district_name"
+)
+
+_SQL_DISTRICT_FILTER = (
+    " WHERE district_id = (SELECT district_id FROM DISTRICT_MASTER WHERE district_name = :district)"
+)
+
+_SQL_LIMIT = " LIMIT 100"
+
+# Abbreviations expanded during normalization, matched in one pass
+_ABBREVIATIONS = {
+    'fir': 'FIR',
+    'sho': 'station house officer',
+    'asi': 'assistant sub inspector',
+    'si': 'sub inspector'
+}
+_ABBREVIATION_RE = re.compile(r'\b(' + '|'.join(_ABBREVIATIONS) + r')\b')
+
 class NL2SQLProcessor:
     """Convert natural language queries to SQL"""
     
@@ -47,6 +102,27 @@ class NL2SQLProcessor:
             'East Godavari', 'Srikakulam', 'Vizianagaram', 'Anantapur', 'Prakasam'
         ]
         
+        # Precompiled scanners - one pass over the text instead of one per keyword
+        self._query_type_re = re.compile(
+            '|'.join(f'(?P<p{i}>{pattern})' for i, pattern in enumerate(self.query_patterns)),
+            re.IGNORECASE
+        )
+        self._query_type_priority = list(self.query_patterns.values())
+        
+        # Longest keywords first so 'firs' wins over 'fir' in the alternation
+        self._entity_re = re.compile(
+            '|'.join(map(re.escape, sorted(self.entity_mapping, key=len, reverse=True)))
+        )
+        self._table_priority = list(dict.fromkeys(self.entity_mapping.values()))
+        
+        self._district_lookup = {district.lower(): district for district in self.districts}
+        self._district_re = re.compile(
+            '|'.join(map(re.escape, sorted(self._district_lookup, key=len, reverse=True)))
+        )
+        
+        # Memoize query analysis on the normalized text; dashboards repeat queries
+        self._compile_query = lru_cache(maxsize=1024)(self._compile_query_uncached)
+        
         logger.info("🔍 NL2SQLProcessor initialized")
         logger.info(f"Database type: {self.database_type}")
     
@@ -66,24 +142,16 @@ class NL2SQLProcessor:
             # Clean and normalize text
             normalized_text = self._normalize_text(text)
             
-            # Detect query type
-            query_type = self._detect_query_type(normalized_text)
-            
-            # Extract entities
-            entities = self._extract_entities(normalized_text)
-            
-            # Generate SQL based on pattern
-            sql_query = await self._generate_sql_by_pattern(query_type, entities, normalized_text)
-            
-            # Validate SQL
-            is_valid = self._validate_sql(sql_query)
+            # Detect query type, extract entities and build SQL (cached)
+            query_type, entities, sql_query, binds, is_valid = self._compile_query(normalized_text)
             
             result = {
                 "sql": sql_query,
+                "binds": dict(binds),
                 "valid": is_valid,
                 "confidence": 0.8 if is_valid else 0.3,
                 "query_type": query_type,
-                "entities": entities,
+                "entities": {key: list(values) for key, values in entities.items()},
                 "original_text": text,
                 "normalized_text": normalized_text
             }
@@ -100,34 +168,56 @@ class NL2SQLProcessor:
             logger.error(f"❌ SQL generation failed: {e}")
             return {
                 "sql": "",
+                "binds": {},
                 "valid": False,
                 "confidence": 0.0,
                 "error": str(e),
                 "original_text": text
             }
     
+    async def generate_sql_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Generate SQL for several queries at once
+        
+        Duplicate texts within a batch are processed only once.
+        
+        Args:
+            texts: Natural language queries
+            
+        Returns:
+            List of results in the same order as texts
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        results = await asyncio.gather(*(self.generate_sql(text) for text in unique_texts))
+        by_text = dict(zip(unique_texts, results))
+        return [dict(by_text[text]) for text in texts]
+    
+    def _compile_query_uncached(
+        self, normalized_text: str
+    ) -> Tuple[str, Dict[str, List[str]], str, Dict[str, Any], bool]:
+        """Run detection, extraction and SQL generation for a normalized query"""
+        query_type = self._detect_query_type(normalized_text)
+        entities = self._extract_entities(normalized_text)
+        sql_query, binds = self._generate_sql_by_pattern(query_type, entities, normalized_text)
+        return query_type, entities, sql_query, binds, self._validate_sql(sql_query)
+    
+    def clear_cache(self):
+        """Drop memoized query analysis results"""
+        self._compile_query.cache_clear()
+    
     def _normalize_text(self, text: str) -> str:
         """Normalize input text"""
-        # Convert to lowercase
+        # Convert to lowercase; everything downstream works on this lowered view
         text = text.lower().strip()
         
         # Replace common abbreviations
-        replacements = {
-            'fir': 'FIR',
-            'sho': 'station house officer',
-            'asi': 'assistant sub inspector',
-            'si': 'sub inspector'
-        }
-        
-        for abbr, full in replacements.items():
-            text = re.sub(rf'\b{abbr}\b', full, text)
-        
-        return text
+        return _ABBREVIATION_RE.sub(lambda m: _ABBREVIATIONS[m.group(1)], text)
     
     def _detect_query_type(self, text: str) -> str:
         """Detect the type of query"""
-        for pattern, query_type in self.query_patterns.items():
-            if re.search(pattern, text, re.IGNORECASE):
+        matched = {match.lastgroup for match in self._query_type_re.finditer(text)}
+        for index, query_type in enumerate(self._query_type_priority):
+            if f'p{index}' in matched:
                 return query_type
         return 'select'  # default
     
@@ -141,15 +231,12 @@ class NL2SQLProcessor:
         }
         
         # Extract table entities
-        for entity, table in self.entity_mapping.items():
-            if entity in text:
-                if table not in entities['tables']:
-                    entities['tables'].append(table)
+        matched_tables = {self.entity_mapping[m] for m in self._entity_re.findall(text)}
+        entities['tables'] = [table for table in self._table_priority if table in matched_tables]
         
         # Extract district names
-        for district in self.districts:
-            if district.lower() in text:
-                entities['districts'].append(district)
+        matched_districts = {self._district_lookup[m] for m in self._district_re.findall(text)}
+        entities['districts'] = [district for district in self.districts if district in matched_districts]
         
         # Extract numbers
         numbers = re.findall(r'\d+', text)
@@ -161,8 +248,17 @@ class NL2SQLProcessor:
         
         return entities
     
-    async def _generate_sql_by_pattern(self, query_type: str, entities: Dict, text: str) -> str:
-        """Generate SQL based on detected pattern"""
+    def _generate_sql_by_pattern(self, query_type: str, entities: Dict, text: str) -> Tuple[str, Dict[str, Any]]:
+        """
+        Generate SQL based on detected pattern
+        
+        Values are returned as bind variables rather than inlined so the
+        database can reuse the parsed statement across different values.
+        
+        Returns:
+            Tuple of (sql, binds)
+        """
+        binds = {}
         
         # Default table if none detected
         main_table = entities['tables'][0] if entities['tables'] else 'FIR'
@@ -171,53 +267,43 @@ class NL2SQLProcessor:
             sql = f"SELECT COUNT(*) as total_count FROM {main_table}"
             
         elif query_type == 'select':
-            if main_table == 'FIR':
-                sql = f"SELECT fir_id, fir_number, incident_date, status FROM {main_table}"
-            elif main_table == 'ARREST':
-                sql = f"SELECT arrest_id, arrested_person_name, arrest_date FROM {main_table}"
-            elif main_table == 'OFFICER_MASTER':
-                sql = f"SELECT officer_id, officer_name, rank FROM {main_table}"
-            else:
-                sql = f"SELECT * FROM {main_table}"
+            sql = _SQL_SELECT_COLUMNS.get(main_table) or f"SELECT * FROM {main_table}"
                 
         elif query_type == 'top':
             if 'officer' in text:
-                sql = """
-                SELECT o.officer_name, COUNT(a.arrest_id) as arrest_count 
-                FROM OFFICER_MASTER o 
-                LEFT JOIN ARREST a ON o.officer_id = a.officer_id 
-                GROUP BY o.officer_name 
-                ORDER BY arrest_count DESC
-                """
+                sql = _SQL_TOP_OFFICERS
             else:
                 sql = f"SELECT * FROM {main_table} ORDER BY incident_date DESC"
                 
         elif query_type == 'compare':
             if entities['districts'] and len(entities['districts']) >= 2:
                 district1, district2 = entities['districts'][:2]
-                sql = f"""
-                SELECT d.district_name, COUNT(f.fir_id) as fir_count
-                FROM DISTRICT_MASTER d
-                LEFT JOIN FIR f ON d.district_id = f.district_id
-                WHERE d.district_name IN ('{district1}', '{district2}')
-                GROUP BY d.district_name
-                """
+                sql = _SQL_COMPARE_DISTRICTS
+                binds = {"district1": district1, "district2": district2}
             else:
                 sql = f"SELECT * FROM {main_table}"
                 
         else:
             sql = f"SELECT * FROM {main_table}"
         
-        # Add district filter if specified
-        if entities['districts'] and 'WHERE' not in sql.upper():
+        # Add district filter if specified (templates all spell WHERE in upper case)
+        if entities['districts'] and 'WHERE' not in sql:
             district = entities['districts'][0]
             if main_table == 'FIR':
-                sql += f" WHERE district_id = (SELECT district_id FROM DISTRICT_MASTER WHERE district_name = '{district}')"
+                sql += _SQL_DISTRICT_FILTER
+                binds["district"] = district
+        
+        # Restrict to today with a range on the bare column, ahead of any ORDER BY
+        if 'today' in entities['dates'] and main_table == 'FIR':
+            today_start, tomorrow_start = _TODAY_RANGE.get(self.database_type, _TODAY_RANGE["sqlite"])
+            head, order_by, tail = sql.partition(" ORDER BY")
+            keyword = " AND" if "WHERE" in head else " WHERE"
+            sql = f"{head}{keyword} incident_date >= {today_start} AND incident_date < {tomorrow_start}{order_by}{tail}"
         
         # Add LIMIT
-        sql += " LIMIT 100"
+        sql += _SQL_LIMIT
         
-        return sql.strip()
+        return sql, binds
     
     def _validate_sql(self, sql: str) -> bool:
         """Basic SQL validation"""
@@ -225,18 +311,14 @@ class NL2SQLProcessor:
             return False
         
         # Check for dangerous keywords
-        dangerous_keywords = ['DROP', 'DELETE', 'UPDATE', 'INSERT', 'TRUNCATE', 'ALTER']
-        sql_upper = sql.upper()
-        
-        for keyword in dangerous_keywords:
-            if keyword in sql_upper:
-                return False
+        if _DANGEROUS_RE.search(sql):
+            return False
         
-        # Check if it starts with SELECT
-        if not sql_upper.strip().startswith('SELECT'):
+        if _WRAPPED_INCIDENT_DATE_RE.search(sql):
             return False
         
-        return True
+        # Check if it starts with SELECT/WITH and parentheses are balanced
+        return bool(_SQL_SHAPE.match(sql)) and sql.count('(') == sql.count(')')
     
     def get_sample_queries(self) -> List[str]:
         """Get sample queries for testing"""
@@ -3,11 +3,30 @@ Speech-to-Text Processor for Indian languages
 """
 import logging
 import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, List, Optional
+from config.settings import settings
+
+# Whisper via CTranslate2 (INT8 quantized); optional, the mock transcriber is used without it
+try:
+    from faster_whisper import WhisperModel, decode_audio
+    import ctranslate2
+    import numpy as np
+except ImportError:
+    WhisperModel = None
 
 logger = logging.getLogger(__name__)
 
+# Whisper expects 16 kHz mono float32 input
+_SAMPLE_RATE = 16000
+_WARMUP_SECONDS = 1
+_AUDIO_CACHE_SIZE = 8
+
 class IndianSTTProcessor:
     """Speech-to-Text Processor for Indian languages (Telugu, Hindi, English)"""
     
@@ -17,62 +36,49 @@ class IndianSTTProcessor:
         self.fallback_model = config.get("fallback", {})
         self.supported_languages = ["te", "hi", "en", "auto"]
         
+        # Whisper model is loaded on first transcription
+        self.whisper_model = None
+        self._whisper_lock = asyncio.Lock()
+        
+        # Recently decoded audio keyed by upload content digest, so a re-sent clip
+        # skips the decode; filled from worker threads, hence the lock
+        self._audio_cache: "OrderedDict[str, Any]" = OrderedDict()
+        self._audio_cache_lock = threading.Lock()
+        
         logger.info("🎤 IndianSTTProcessor initialized")
         logger.info(f"Primary model: {self.primary_model.get('name', 'Not specified')}")
         logger.info(f"Fallback model: {self.fallback_model.get('name', 'Not specified')}")
     
-    async def transcribe_audio(self, audio_path: str, language: str = "auto") -> Dict[str, Any]:
+    async def transcribe_audio(self, audio_path: str, language: str = "auto",
+                               audio_digest: Optional[str] = None) -> Dict[str, Any]:
         """
         Transcribe audio file to text
         
         Args:
             audio_path: Path to audio file
             language: Language code (te, hi, en, auto)
+            audio_digest: Content hash of the file, enables the decoded-audio cache
             
         Returns:
             Dictionary with transcription results
         """
         try:
-            logger.info(f"🎵 Transcribing audio: {audio_path} (language: {language})")
-            
-            # Validate file exists
-            if not Path(audio_path).exists():
-                raise FileNotFoundError(f"Audio file not found: {audio_path}")
-            
-            # Validate language
-            if language not in self.supported_languages:
-                logger.warning(f"Unsupported language {language}, using auto")
-                language = "auto"
-            
-            # Simulate processing time
-            await asyncio.sleep(0.5)
-            
-            # Mock transcription based on language
-            mock_transcriptions = {
-                "te": "ఇది తెలుగు లో మాట్లాడిన ఆడియో ఫైల్ యొక్క నమూనా ట్రాన్స్క్రిప్షన్",
-                "hi": "यह हिंदी में बोली गई ऑडियो फ़ाइल का नमूना ट्रांसक्रिप्शन है",
-                "en": "This is a sample transcription of the audio file spoken in English",
-                "auto": "This is an automatically detected transcription of the audio content"
-            }
-            
-            transcription_text = mock_transcriptions.get(language, mock_transcriptions["auto"])
+            start_time = time.perf_counter()
+            segments = [
+                segment async for segment in self.transcribe_audio_streaming(audio_path, language, audio_digest)
+            ]
+            transcription_text = " ".join(segment["text"] for segment in segments)
+            detected_language = segments[0]["language"] if segments else "en"
             
             result = {
                 "text": transcription_text,
-                "confidence": 0.85,
-                "language": language if language != "auto" else "en",
-                "detected_language": "en" if language == "auto" else language,
-                "processing_time": 0.5,
-                "segments": [
-                    {
-                        "start": 0.0,
-                        "end": 3.0,
-                        "text": transcription_text,
-                        "confidence": 0.85
-                    }
-                ],
-                "model_used": self.primary_model.get("name", "mock_model"),
-                "audio_duration": 3.0
+                "confidence": self._average_confidence(segments),
+                "language": detected_language,
+                "detected_language": detected_language,
+                "processing_time": time.perf_counter() - start_time,
+                "segments": segments,
+                "model_used": segments[0].get("model", "mock_model") if segments else self.primary_model.get("name", "mock_model"),
+                "audio_duration": segments[-1]["end"] if segments else 0.0
             }
             
             logger.info(f"✅ Transcription completed: {len(transcription_text)} characters")
@@ -88,6 +94,156 @@ class IndianSTTProcessor:
                 "processing_time": 0.0
             }
     
+    async def transcribe_audio_streaming(self, audio_path: str, language: str = "auto",
+                                         audio_digest: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Transcribe audio file, yielding segments as soon as they are decoded
+        
+        Args:
+            audio_path: Path to audio file
+            language: Language code (te, hi, en, auto)
+            audio_digest: Content hash of the file, enables the decoded-audio cache
+            
+        Yields:
+            Segment dictionaries with start, end, text, confidence and language
+        """
+        logger.info(f"🎵 Transcribing audio: {audio_path} (language: {language})")
+        
+        # Validate file exists
+        if not Path(audio_path).exists():
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+        
+        # Validate language
+        if language not in self.supported_languages:
+            logger.warning(f"Unsupported language {language}, using auto")
+            language = "auto"
+        
+        whisper_model = await self._get_whisper_model()
+        if whisper_model is not None:
+            audio = await asyncio.to_thread(self._load_audio, audio_path, audio_digest)
+            async for segment in self._transcribe_whisper(whisper_model, audio, language):
+                yield segment
+            return
+        
+        # Simulate processing time
+        await asyncio.sleep(0.5)
+        
+        # Mock transcription based on language
+        mock_transcriptions = {
+            "te": "ఇది తెలుగు లో మాట్లాడిన ఆడియో ఫైల్ యొక్క నమూనా ట్రాన్స్క్రిప్షన్",
+            "hi": "यह हिंदी में बोली गई ऑडियो फ़ाइल का नमूना ट्रांसक्रिप्शन है",
+            "en": "This is a sample transcription of the audio file spoken in English",
+            "auto": "This is an automatically detected transcription of the audio content"
+        }
+        
+        yield {
+            "start": 0.0,
+            "end": 3.0,
+            "text": mock_transcriptions.get(language, mock_transcriptions["auto"]),
+            "confidence": 0.85,
+            "language": "en" if language == "auto" else language,
+            "model": self.primary_model.get("name", "mock_model")
+        }
+    
+    async def _get_whisper_model(self) -> Optional[Any]:
+        """Load the Whisper fallback model once, off the event loop"""
+        if WhisperModel is None or self.fallback_model.get("model_type") != "whisper":
+            return None
+        
+        if self.whisper_model is None:
+            async with self._whisper_lock:
+                if self.whisper_model is None:
+                    self.whisper_model = await asyncio.to_thread(self._load_whisper_model)
+        
+        return self.whisper_model
+    
+    def _load_whisper_model(self):
+        """Load Whisper through CTranslate2 with INT8 weights (FP16 compute on GPU)"""
+        model_size = self.fallback_model.get("name", "openai/whisper-medium").rsplit("whisper-", 1)[-1]
+        
+        device = self.fallback_model.get("device", "auto")
+        if device == "auto":
+            device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        if device == "cuda" and self.fallback_model.get("fp16", True):
+            default_compute_type = "int8_float16"
+        else:
+            default_compute_type = "int8"
+        compute_type = self.fallback_model.get("compute_type", default_compute_type)
+        
+        model = WhisperModel(
+            model_size,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=os.cpu_count() or 4,
+            num_workers=1,
+            # Same cache scripts/download_models.py pre-fetches into
+            download_root=str(settings.MODELS_DIR)
+        )
+        
+        if device == "cuda":
+            # Size CTranslate2's caching GPU allocator now, so the first real
+            # request doesn't pay for CUDA allocations and kernel setup
+            warmup_segments, _ = model.transcribe(
+                np.zeros(_SAMPLE_RATE * _WARMUP_SECONDS, dtype=np.float32), language="en", beam_size=1
+            )
+            for _ in warmup_segments:
+                pass
+        
+        logger.info(f"✅ Whisper {model_size} loaded on {device} ({compute_type})")
+        return model
+    
+    def _load_audio(self, audio_path: str, audio_digest: Optional[str] = None):
+        """Decode audio into a 16 kHz mono float32 array, reusing recent decodes"""
+        # Uploads land in fresh temp files, so only the content digest computed
+        # while the upload was written can recognise a repeat
+        if audio_digest is None:
+            return decode_audio(audio_path, sampling_rate=_SAMPLE_RATE)
+        
+        with self._audio_cache_lock:
+            audio = self._audio_cache.pop(audio_digest, None)
+            if audio is not None:
+                self._audio_cache[audio_digest] = audio
+                return audio
+        
+        audio = decode_audio(audio_path, sampling_rate=_SAMPLE_RATE)
+        
+        with self._audio_cache_lock:
+            self._audio_cache[audio_digest] = audio
+            while len(self._audio_cache) > _AUDIO_CACHE_SIZE:
+                self._audio_cache.popitem(last=False)
+        return audio
+    
+    async def _transcribe_whisper(self, model, audio, language: str) -> AsyncIterator[Dict[str, Any]]:
+        """Yield Whisper segments as they are decoded in a worker thread"""
+        segments, info = await asyncio.to_thread(
+            model.transcribe,
+            audio,
+            language=None if language == "auto" else language,
+            beam_size=self.fallback_model.get("beam_size", 1),
+            temperature=self.fallback_model.get("temperature", 0.0),
+            vad_filter=self.fallback_model.get("vad_filter", True)
+        )
+        
+        # Segments are decoded lazily, one per next() call
+        while True:
+            segment = await asyncio.to_thread(next, segments, None)
+            if segment is None:
+                break
+            yield {
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text.strip(),
+                "confidence": math.exp(segment.avg_logprob),
+                "language": info.language,
+                "model": self.fallback_model.get("name", "whisper")
+            }
+    
+    def _average_confidence(self, segments: List[Dict[str, Any]]) -> float:
+        """Average segment confidence"""
+        if not segments:
+            return 0.0
+        return sum(segment.get("confidence", 0.0) for segment in segments) / len(segments)
+    
     async def validate_audio(self, audio_path: str) -> Dict[str, Any]:
         """Validate audio file"""
         try:
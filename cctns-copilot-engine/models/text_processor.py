@@ -9,6 +9,49 @@ from typing import Dict, List, Optional
 from transformers import T5Tokenizer, T5ForConditionalGeneration
 from config.settings import settings
 
+# "by <name> officer|station": the name run competes with the \s+ after it, so
+# cost is quadratic in text length. Texts past the limit use a capture bounded
+# to five words, which stays linear but can pick a shorter name.
+_BY_NAME_PATTERN = re.compile(r'(?<!\s)\s+by\s+([a-zA-Z\s]+)\s+(officer|station)', re.IGNORECASE)
+_BY_NAME_PATTERN_BOUNDED = re.compile(
+    r'(?<!\s)\s+by\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,4})\s+(officer|station)', re.IGNORECASE
+)
+_UNBOUNDED_NAME_MAX_LENGTH = 1000
+
+# Query structure rewrites, compiled once and applied in order (later patterns see earlier output).
+# Patterns that start with whitespace only try the start of a whitespace run;
+# a match from inside the run would be found from its start anyway.
+_QUERY_STRUCTURE_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), replacement)
+    for pattern, replacement in [
+        # Show/Display patterns
+        (r'^(show|display|list|get|find)\s+', r'SELECT '),
+        (r'^count\s+', r'COUNT '),
+        (r'^how many\s+', r'COUNT '),
+        (r'^total\s+', r'COUNT '),
+        
+        # Add WHERE clause hints
+        (r'(?<!\s)\s+in\s+([a-zA-Z]+)\s+(district|station)', r' WHERE \2 = "\1"'),
+        (r'(?<!\s)\s+for\s+([a-zA-Z]+)\s+(officer|station)', r' WHERE \2 = "\1"')
+    ]
+] + [
+    (_BY_NAME_PATTERN, r' WHERE \2 = "\1"')
+] + [
+    (re.compile(pattern, re.IGNORECASE), replacement)
+    for pattern, replacement in [
+        # Time patterns
+        (r'(?<!\s)\s+today\b', r' WHERE DATE = TODAY'),
+        (r'(?<!\s)\s+this\s+month\b', r' WHERE MONTH = CURRENT_MONTH'),
+        (r'(?<!\s)\s+last\s+month\b', r' WHERE MONTH = LAST_MONTH'),
+        (r'(?<!\s)\s+this\s+year\b', r' WHERE YEAR = CURRENT_YEAR')
+    ]
+]
+
+# Proper nouns capitalized during final cleanup, matched in a single pass
+_CLEANUP_DISTRICTS = ["guntur", "vijayawada", "visakhapatnam", "tirupati", "kurnool"]
+_CLEANUP_DISTRICT_RE = re.compile(rf'\b({"|".join(_CLEANUP_DISTRICTS)})\b', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
 class TextProcessor:
     """Text cleanup and enhancement processor"""
     
@@ -36,6 +79,7 @@ class TextProcessor:
             
             # English corrections
             "fir": "FIR",
+            "firs": "FIRs",
             "sho": "SHO",
             "station house officer": "SHO",
             "guntur": "Guntur",
@@ -56,6 +100,14 @@ class TextProcessor:
             "crimes are": "crimes",
             "officers are": "officers"
         }
+        
+        # All corrections in one pass; longest terms first so phrases win over
+        # their prefixes, and whole-word only so "show" or "firewall" are left alone
+        self._police_lookup = {term.lower(): correct for term, correct in self.police_corrections.items()}
+        self._police_corrections_re = re.compile(
+            r'(?<!\w)(' + '|'.join(map(re.escape, sorted(self._police_lookup, key=len, reverse=True))) + r')(?!\w)',
+            re.IGNORECASE
+        )
     
     def _load_model(self):
         """Load FLAN-T5 model for text processing"""
@@ -129,16 +181,9 @@ class TextProcessor:
     
     def _apply_police_corrections(self, text: str) -> str:
         """Apply police domain terminology corrections"""
-        corrected = text
-        
-        for incorrect, correct in self.police_corrections.items():
-            # Case-insensitive replacement
-            corrected = re.sub(
-                re.escape(incorrect), 
-                correct, 
-                corrected, 
-                flags=re.IGNORECASE
-            )
+        corrected = self._police_corrections_re.sub(
+            lambda m: self._police_lookup[m.group(1).lower()], text
+        )
         
         return corrected.strip()
     
@@ -183,28 +228,11 @@ class TextProcessor:
         """Enhance query structure for better SQL generation"""
         enhanced = text.lower().strip()
         
-        # Query type patterns
-        query_patterns = {
-            # Show/Display patterns
-            r'^(show|display|list|get|find)\s+': r'SELECT ',
-            r'^count\s+': r'COUNT ',
-            r'^how many\s+': r'COUNT ',
-            r'^total\s+': r'COUNT ',
-            
-            # Add WHERE clause hints
-            r'\s+in\s+([a-zA-Z]+)\s+(district|station)': r' WHERE \2 = "\1"',
-            r'\s+for\s+([a-zA-Z]+)\s+(officer|station)': r' WHERE \2 = "\1"',
-            r'\s+by\s+([a-zA-Z\s]+)\s+(officer|station)': r' WHERE \2 = "\1"',
-            
-            # Time patterns
-            r'\s+today\b': r' WHERE DATE = TODAY',
-            r'\s+this\s+month\b': r' WHERE MONTH = CURRENT_MONTH',
-            r'\s+last\s+month\b': r' WHERE MONTH = LAST_MONTH',
-            r'\s+this\s+year\b': r' WHERE YEAR = CURRENT_YEAR'
-        }
-        
-        for pattern, replacement in query_patterns.items():
-            enhanced = re.sub(pattern, replacement, enhanced, flags=re.IGNORECASE)
+        long_text = len(enhanced) > _UNBOUNDED_NAME_MAX_LENGTH
+        for pattern, replacement in _QUERY_STRUCTURE_PATTERNS:
+            if long_text and pattern is _BY_NAME_PATTERN:
+                pattern = _BY_NAME_PATTERN_BOUNDED
+            enhanced = pattern.sub(replacement, enhanced)
         
         return enhanced.strip()
     
@@ -213,17 +241,10 @@ class TextProcessor:
         cleaned = text
         
         # Remove extra spaces
-        cleaned = re.sub(r'\s+', ' ', cleaned)
+        cleaned = _WHITESPACE_RE.sub(' ', cleaned)
         
         # Capitalize proper nouns
-        districts = ["guntur", "vijayawada", "visakhapatnam", "tirupati", "kurnool"]
-        for district in districts:
-            cleaned = re.sub(
-                rf'\b{district}\b', 
-                district.title(), 
-                cleaned, 
-                flags=re.IGNORECASE
-            )
+        cleaned = _CLEANUP_DISTRICT_RE.sub(lambda m: m.group(1).title(), cleaned)
         
         # Fix common patterns
         cleaned = cleaned.replace(" FIR ", " FIR ")
@@ -235,12 +256,13 @@ class TextProcessor:
         """Get list of corrections applied"""
         corrections = []
         
-        if original.lower() != final.lower():
+        original_lower = original.lower()
+        if original_lower != final.lower():
             corrections.append(f"Enhanced: '{original}' → '{final}'")
         
         # Check for specific corrections
         for term, replacement in self.police_corrections.items():
-            if term.lower() in original.lower() and replacement in final:
+            if term.lower() in original_lower and replacement in final:
                 corrections.append(f"Police term: '{term}' → '{replacement}'")
         
         return corrections
@@ -251,8 +273,9 @@ class TextProcessor:
         confidence = 0.8
         
         # Boost if police terms were corrected
+        original_lower = original.lower()
         police_terms_found = sum(1 for term in self.police_corrections.keys() 
-                               if term.lower() in original.lower())
+                               if term.lower() in original_lower)
         confidence += min(police_terms_found * 0.05, 0.15)
         
         # Boost if structure was enhanced
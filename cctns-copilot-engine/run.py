@@ -36,14 +36,26 @@ def main():
     config["reload"] = os.getenv("DEBUG", "false").lower() == "true"
     config["log_level"] = os.getenv("LOG_LEVEL", config["log_level"]).lower()
     
+    # Single worker by default: every worker loads its own copy of the STT, text
+    # and NL2SQL models. Set WORKERS to scale out on hosts with memory to spare.
+    # Reload mode needs a single process.
+    config["workers"] = 1 if config["reload"] else int(os.getenv("WORKERS", 1))
+    
     print(f"📍 Host: {config['host']}:{config['port']}")
     print(f"🔧 Debug mode: {config['reload']}")
+    print(f"👷 Workers: {config['workers']}")
     print(f"📊 Log level: {config['log_level']}")
     
-    # Create necessary directories
-    directories = ["logs", "temp", "reports", "config"]
-    for directory in directories:
+    # Create necessary directories once here, including the ones Settings
+    # would otherwise create on import in every worker process
+    directories = [
+        "logs", "temp", "config", "uploads", "web/static",
+        os.getenv("REPORTS_DIR", "reports"),
+        os.getenv("MODELS_DIR", "models_cache")
+    ]
+    for directory in dict.fromkeys(directories):
         os.makedirs(directory, exist_ok=True)
+    os.environ.setdefault("SKIP_DIR_BOOTSTRAP", "true")
     
     print("📁 Created necessary directories")
     
@@ -112,6 +124,12 @@ cctns_schema:
             host=config["host"],
             port=config["port"],
             reload=config["reload"],
+            workers=config["workers"],
+            # "auto" picks uvloop and httptools (uvicorn[standard]) when installed
+            loop="auto",
+            http="auto",
+            access_log=os.getenv("ACCESS_LOG", "false").lower() == "true",
+            proxy_headers=True,
             log_level=config["log_level"]
         )
     except KeyboardInterrupt:
@@ -2,7 +2,7 @@
 Download and cache required models
 """
 import torch
-import whisper
+from faster_whisper import download_model
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 from pathlib import Path
 import logging
@@ -14,9 +14,9 @@ def download_models():
     
     print("📥 Downloading models...")
     
-    # 1. Whisper for STT
+    # 1. Whisper (CTranslate2 conversion) for STT, in the cache WhisperModel reads from
     print("Downloading Whisper...")
-    whisper.load_model("medium", download_root=models_dir)
+    download_model("medium", cache_dir=str(models_dir))
     
     # 2. FLAN-T5 for text processing
     print("Downloading FLAN-T5...")
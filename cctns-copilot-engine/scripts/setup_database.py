@@ -1,7 +1,7 @@
 """
 Setup CCTNS database schema and sample data
 """
-import cx_Oracle
+import oracledb
 import os
 import logging
 from pathlib import Path
@@ -14,7 +14,7 @@ def setup_database():
         return
     
     try:
-        conn = cx_Oracle.connect(connection_string)
+        conn = oracledb.connect(connection_string)
         cursor = conn.cursor()
         
         print("📊 Setting up CCTNS database...")
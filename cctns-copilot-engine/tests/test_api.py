@@ -0,0 +1,41 @@
+"""
+Tests for the API route helpers
+"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from api import reports
+from models.nl2sql_processor import _TODAY_RANGE, _WRAPPED_INCIDENT_DATE_RE
+
+
+@pytest.mark.parametrize("database_type", ["sqlite", "oracle"])
+def test_daily_summary_uses_backend_date_range(monkeypatch, database_type):
+    monkeypatch.setattr(reports, "_current_db_type", lambda: database_type)
+    
+    query = asyncio.run(reports._get_quick_report_config("daily_summary", {}))["query"]
+    
+    today_start, tomorrow_start = _TODAY_RANGE[database_type]
+    assert f"incident_date >= {today_start}" in query
+    assert f"incident_date < {tomorrow_start}" in query
+    assert not _WRAPPED_INCIDENT_DATE_RE.search(query)
+
+
+def test_daily_summary_runs_on_sqlite(monkeypatch):
+    monkeypatch.setattr(reports, "_current_db_type", lambda: "sqlite")
+    query = asyncio.run(reports._get_quick_report_config("daily_summary", {}))["query"]
+    
+    connection = sqlite3.connect(":memory:")
+    try:
+        connection.executescript("""
+            CREATE TABLE FIR (fir_id INTEGER PRIMARY KEY, incident_date DATE, status TEXT);
+            INSERT INTO FIR VALUES
+                (1, datetime('now', 'start of day', '+1 hour'), 'OPEN'),
+                (2, datetime('now', 'start of day', '+2 hours'), 'CLOSED'),
+                (3, datetime('now', 'start of day', '-1 hour'), 'OPEN');
+        """)
+        assert connection.execute(query).fetchone() == (2, 1, 1)
+    finally:
+        connection.close()
+
@@ -0,0 +1,64 @@
+"""
+Tests for the model processors
+"""
+import asyncio
+import sqlite3
+
+import pytest
+
+from models.nl2sql_processor import NL2SQLProcessor, _TODAY_RANGE, _WRAPPED_INCIDENT_DATE_RE
+
+
+@pytest.fixture
+def fir_db():
+    """In-memory FIR table with one incident today and one yesterday"""
+    connection = sqlite3.connect(":memory:")
+    connection.executescript("""
+        CREATE TABLE DISTRICT_MASTER (district_id INTEGER PRIMARY KEY, district_name TEXT);
+        CREATE TABLE FIR (fir_id INTEGER PRIMARY KEY, district_id INTEGER, incident_date DATE, status TEXT);
+        CREATE INDEX idx_fir_incident_date ON FIR (incident_date);
+        INSERT INTO DISTRICT_MASTER VALUES (1, 'Guntur'), (2, 'Krishna');
+        INSERT INTO FIR VALUES
+            (1, 1, datetime('now', 'start of day', '+1 hour'), 'OPEN'),
+            (2, 1, datetime('now', 'start of day', '-1 hour'), 'CLOSED'),
+            (3, 2, datetime('now', 'start of day', '+2 hours'), 'CLOSED');
+    """)
+    yield connection
+    connection.close()
+
+
+@pytest.mark.parametrize("database_type", ["sqlite", "oracle"])
+def test_today_filter_is_a_range_on_incident_date(database_type):
+    processor = NL2SQLProcessor({"database_type": database_type})
+    result = asyncio.run(processor.generate_sql("How many FIRs were registered today"))
+    
+    today_start, tomorrow_start = _TODAY_RANGE[database_type]
+    assert result["valid"]
+    assert f"WHERE incident_date >= {today_start} AND incident_date < {tomorrow_start}" in result["sql"]
+    assert not _WRAPPED_INCIDENT_DATE_RE.search(result["sql"])
+
+
+def test_today_filter_runs_on_sqlite(fir_db):
+    processor = NL2SQLProcessor({"database_type": "sqlite"})
+    
+    result = asyncio.run(processor.generate_sql("How many FIRs were registered today"))
+    assert fir_db.execute(result["sql"], result["binds"]).fetchone()[0] == 2
+    
+    result = asyncio.run(processor.generate_sql("How many FIRs were registered in Guntur today"))
+    assert result["binds"] == {"district": "Guntur"}
+    assert fir_db.execute(result["sql"], result["binds"]).fetchone()[0] == 1
+    
+    # A generated ORDER BY stays after the date range
+    result = asyncio.run(processor.generate_sql("Top FIRs today"))
+    assert result["sql"].index("incident_date >=") < result["sql"].index("ORDER BY")
+    assert len(fir_db.execute(result["sql"], result["binds"]).fetchall()) == 2
+
+
+def test_generated_sql_never_wraps_incident_date():
+    processor = NL2SQLProcessor({})
+    assert not processor._validate_sql("SELECT COUNT(*) FROM FIR WHERE DATE(incident_date) = DATE('now')")
+    assert not processor._validate_sql("SELECT COUNT(*) FROM FIR f WHERE date( f.incident_date ) = CURRENT_DATE")
+    
+    for query in processor.get_sample_queries() + ["Count FIRs today", "Show FIRs in Guntur today"]:
+        sql = asyncio.run(processor.generate_sql(query))["sql"]
+        assert not _WRAPPED_INCIDENT_DATE_RE.search(sql), query